@@ -7,6 +7,7 @@ import {
 import {
   CourseEntity,
   CourseEnrollmentEntity,
+  CourseProps,
 } from "../../domain/entities/course.entity";
 
 export const COURSE_REPOSITORY_TOKEN = Symbol("ICourseRepository");
@@ -34,6 +35,7 @@ export class CreateCourseUseCase {
     targetAudience?: string;
     prerequisites?: string;
     sourceUrl?: string;
+    sourceUrls?: string[];
   }): Promise<Result<any[], string>> {
     const existing = await this.repo.findBySlug(dto.slug);
     if (existing) {
@@ -64,10 +66,64 @@ export class CreateCourseUseCase {
       certification: c.certification,
       targetAudience: c.targetAudience,
       prerequisites: c.prerequisites,
+      sourceUrl: c.sourceUrl,
+      sourceUrls: c.sourceUrls,
     };
   }
 }
 
+export interface BulkCourseInput {
+  title: string;
+  description?: string;
+  slug: string;
+  isQualificationCourse?: boolean;
+  startDate?: string;
+  endDate?: string;
+  courseType?: string;
+  price?: string;
+  location?: string;
+  enrollmentLink?: string;
+  certification?: string;
+  targetAudience?: string;
+  prerequisites?: string;
+  sourceUrl?: string;
+  sourceUrls?: string[];
+}
+
+/** Create or update many courses by slug in one round trip (scraped catalog sync). */
+@Injectable()
+export class UpsertCoursesUseCase {
+  constructor(
+    @Inject(COURSE_REPOSITORY_TOKEN) private readonly repo: ICourseRepository,
+  ) {}
+  async execute(
+    courses: BulkCourseInput[],
+  ): Promise<
+    Result<{ inserted: number; updated: number; unchanged: number }, string>
+  > {
+    if (!Array.isArray(courses) || courses.some((c) => !c?.slug || !c?.title))
+      return err("courses must be an array of courses with title and slug");
+    const props: Omit<CourseProps, "createdAt">[] = [];
+    for (const { startDate, endDate, ...rest } of courses) {
+      const start = startDate ? new Date(startDate) : undefined;
+      const end = endDate ? new Date(endDate) : undefined;
+      if (
+        (start && Number.isNaN(start.getTime())) ||
+        (end && Number.isNaN(end.getTime()))
+      )
+        return err(`invalid date for course ${rest.slug}`);
+      props.push({
+        ...rest,
+        isQualificationCourse: rest.isQualificationCourse ?? false,
+        // Dates only when given: an undefined key would still reach $set.
+        ...(start && { startDate: start }),
+        ...(end && { endDate: end }),
+      });
+    }
+    return ok(await this.repo.upsertManyBySlug(props));
+  }
+}
+
 @Injectable()
 export class ListCoursesUseCase {
   constructor(
@@ -95,6 +151,8 @@ export class ListCoursesUseCase {
         certification: c.certification,
         targetAudience: c.targetAudience,
         prerequisites: c.prerequisites,
+        sourceUrl: c.sourceUrl,
+        sourceUrls: c.sourceUrls,
       })),
     );
   }
@@ -12,6 +12,7 @@ import {
   COURSE_REPOSITORY_TOKEN,
   COURSE_ENROLLMENT_REPOSITORY_TOKEN,
   CreateCourseUseCase,
+  UpsertCoursesUseCase,
   ListCoursesUseCase,
   EnrollCourseUseCase,
   MyEnrollmentsUseCase,
@@ -36,6 +37,7 @@ import { CoursesController } from "./interface/http/courses.controller";
       useClass: CourseEnrollmentMongoRepository,
     },
     CreateCourseUseCase,
+    UpsertCoursesUseCase,
     ListCoursesUseCase,
     EnrollCourseUseCase,
     MyEnrollmentsUseCase,
@@ -16,6 +16,8 @@ export interface CourseProps {
   targetAudience?: string;
   prerequisites?: string;
   sourceUrl?: string;
+  /** Every site listing the course, when cross-source duplicates were merged */
+  sourceUrls?: string[];
   createdAt?: Date;
 }
 
@@ -73,6 +75,12 @@ export class CourseEntity extends Entity {
   get prerequisites() {
     return this.props.prerequisites;
   }
+  get sourceUrl() {
+    return this.props.sourceUrl;
+  }
+  get sourceUrls() {
+    return this.props.sourceUrls;
+  }
 }
 
 /* ─── CourseEnrollmentEntity ─── */
@@ -1,6 +1,7 @@
 import {
   CourseEntity,
   CourseEnrollmentEntity,
+  CourseProps,
 } from "../entities/course.entity";
 
 export interface ICourseRepository {
@@ -12,6 +13,10 @@ export interface ICourseRepository {
   findById(id: string): Promise<CourseEntity | null>;
   findBySlug(slug: string): Promise<CourseEntity | null>;
   save(entity: CourseEntity): Promise<CourseEntity>;
+  /** Insert new slugs, update the others; isQualificationCourse is only set on insert. */
+  upsertManyBySlug(
+    courses: Omit<CourseProps, "createdAt">[],
+  ): Promise<{ inserted: number; updated: number; unchanged: number }>;
 }
 
 export interface ICourseEnrollmentRepository {
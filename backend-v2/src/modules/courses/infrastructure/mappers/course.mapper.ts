@@ -21,6 +21,7 @@ export class CourseMapper {
       targetAudience: raw.targetAudience,
       prerequisites: raw.prerequisites,
       sourceUrl: raw.sourceUrl,
+      sourceUrls: raw.sourceUrls,
       createdAt: raw.createdAt,
     });
   }
@@ -40,6 +41,8 @@ export class CourseMapper {
       certification: e.certification,
       targetAudience: e.targetAudience,
       prerequisites: e.prerequisites,
+      sourceUrl: e.sourceUrl,
+      sourceUrls: e.sourceUrls,
     };
   }
 }
@@ -8,6 +8,7 @@ import {
 import {
   CourseEntity,
   CourseEnrollmentEntity,
+  CourseProps,
 } from "../../../domain/entities/course.entity";
 import {
   CourseMapper,
@@ -48,6 +49,30 @@ export class CourseMongoRepository implements ICourseRepository {
     const doc = await this.model.create(data);
     return CourseMapper.toDomain(doc.toObject());
   }
+
+  async upsertManyBySlug(
+    courses: Omit<CourseProps, "createdAt">[],
+  ): Promise<{ inserted: number; updated: number; unchanged: number }> {
+    if (courses.length === 0) return { inserted: 0, updated: 0, unchanged: 0 };
+    const result = await this.model.bulkWrite(
+      courses.map(({ slug, isQualificationCourse, ...fields }) => ({
+        updateOne: {
+          filter: { slug },
+          update: {
+            $set: fields,
+            $setOnInsert: { isQualificationCourse },
+          },
+          upsert: true,
+        },
+      })),
+      { ordered: false },
+    );
+    return {
+      inserted: result.upsertedCount,
+      updated: result.modifiedCount,
+      unchanged: courses.length - result.upsertedCount - result.modifiedCount,
+    };
+  }
 }
 
 @Injectable()
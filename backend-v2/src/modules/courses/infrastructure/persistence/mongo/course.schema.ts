@@ -16,6 +16,7 @@ export const CourseMongoSchema = new Schema(
     targetAudience: String,
     prerequisites: String,
     sourceUrl: String,
+    sourceUrls: [String],
   },
   { timestamps: true },
 );
@@ -8,11 +8,14 @@ import {
   Query,
   Request,
   NotFoundException,
+  BadRequestException,
 } from "@nestjs/common";
 import { ApiTags, ApiBearerAuth, ApiOperation } from "@nestjs/swagger";
 import { Roles } from "../../../../shared/decorators/roles.decorator";
 import {
   CreateCourseUseCase,
+  UpsertCoursesUseCase,
+  BulkCourseInput,
   ListCoursesUseCase,
   EnrollCourseUseCase,
   MyEnrollmentsUseCase,
@@ -26,6 +29,7 @@ import { Public } from "../../../../shared/decorators/public.decorator";
 export class CoursesController {
   constructor(
     private readonly createUC: CreateCourseUseCase,
+    private readonly upsertUC: UpsertCoursesUseCase,
     private readonly listUC: ListCoursesUseCase,
     private readonly enrollUC: EnrollCourseUseCase,
     private readonly myEnrollUC: MyEnrollmentsUseCase,
@@ -70,6 +74,7 @@ export class CoursesController {
       targetAudience?: string;
       prerequisites?: string;
       sourceUrl?: string;
+      sourceUrls?: string[];
     },
   ) {
     const dto = {
@@ -81,6 +86,18 @@ export class CoursesController {
     return result.value;
   }
 
+  @Post("bulk")
+  @Roles("admin")
+  @ApiBearerAuth("JWT-auth")
+  @ApiOperation({
+    summary: "Create or update many courses by slug (Admin, scraped data sync)",
+  })
+  async upsertMany(@Body("courses") courses: BulkCourseInput[]) {
+    const result = await this.upsertUC.execute(courses);
+    if (result.isFailure) throw new BadRequestException(result.error);
+    return result.value;
+  }
+
   @Get("admin/enrollments")
   @Roles("admin")
   @ApiBearerAuth("JWT-auth")
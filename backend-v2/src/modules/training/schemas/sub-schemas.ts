@@ -11,7 +11,14 @@ export class ContentSection {
   @Prop() title?: string;
   @Prop() content?: string;
   @Prop() imageUrl?: string;
+  @Prop() imageWidth?: number;
+  @Prop() imageHeight?: number;
+  @Prop() imageHash?: string;
   @Prop() videoUrl?: string;
+  @Prop() videoTitle?: string;
+  @Prop() videoDuration?: number;
+  @Prop() thumbnailUrl?: string;
+  @Prop() videoProvider?: string;
   @Prop({ type: Map, of: String }) definitions?: Record<string, string>;
   @Prop({ type: [String] }) listItems?: string[];
   @Prop({ default: 0 }) order!: number;
@@ -2,6 +2,7 @@ import {
   Injectable,
   NotFoundException,
   BadRequestException,
+  ServiceUnavailableException,
   Inject,
   forwardRef,
 } from "@nestjs/common";
@@ -15,6 +16,7 @@ import { CreateTrainingCourseDto } from "./dto/create-training-course.dto";
 import { UpdateTrainingCourseDto } from "./dto/update-training-course.dto";
 import { ApproveTrainingCourseDto } from "./dto/approve-training-course.dto";
 import { SetTrainingCertifiedFromTrainingCoursesUseCase } from "../volunteers/application/use-cases/volunteer.use-cases";
+import { CloudinaryService } from "@/modules/cloudinary/cloudinary.service";
 
 const QUIZ_PASS_THRESHOLD_PERCENT = 80;
 
@@ -46,6 +48,7 @@ export class TrainingService {
     private readonly enrollmentModel: Model<TrainingEnrollment>,
     @Inject(forwardRef(() => SetTrainingCertifiedFromTrainingCoursesUseCase))
     private readonly setTrainingCertifiedUC: SetTrainingCertifiedFromTrainingCoursesUseCase,
+    private readonly cloudinary: CloudinaryService,
   ) {}
 
   async listApproved() {
@@ -97,6 +100,16 @@ export class TrainingService {
     }
   }
 
+  /** Scraped thumbnails use their perceptual hash as publicId, so re-uploads overwrite. */
+  async uploadCourseImage(buffer: Buffer, hash: string): Promise<string> {
+    if (!this.cloudinary.isConfigured())
+      throw new ServiceUnavailableException("Cloudinary is not configured");
+    return this.cloudinary.uploadBuffer(buffer, {
+      folder: "cognicare/training",
+      publicId: hash,
+    });
+  }
+
   async create(dto: CreateTrainingCourseDto) {
     const created = await this.courseModel.create({
       title: dto.title,
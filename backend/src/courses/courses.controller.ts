@@ -8,6 +8,7 @@ import {
   UseGuards,
   Query,
   Request,
+  BadRequestException,
 } from '@nestjs/common';
 import {
   ApiTags,
@@ -17,7 +18,16 @@ import {
 } from '@nestjs/swagger';
 import { JwtAuthGuard } from '../auth/jwt-auth.guard';
 import { AdminGuard } from '../auth/admin.guard';
-import { CoursesService } from './courses.service';
+import { CoursesService, CourseInput } from './courses.service';
+
+/** Date of a bulk-imported course; 400 instead of a failed bulkWrite when invalid. */
+function parseDate(value: string, slug: string): Date {
+  const date = new Date(value);
+  if (Number.isNaN(date.getTime())) {
+    throw new BadRequestException(`invalid date ${value} for course ${slug}`);
+  }
+  return date;
+}
 
 @ApiTags('courses')
 @Controller('courses')
@@ -67,6 +77,7 @@ export class CoursesController {
       targetAudience?: string;
       prerequisites?: string;
       sourceUrl?: string;
+      sourceUrls?: string[];
     },
   ) {
     const dto = {
@@ -77,6 +88,44 @@ export class CoursesController {
     return this.coursesService.create(dto);
   }
 
+  @Post('bulk')
+  @UseGuards(JwtAuthGuard, AdminGuard)
+  @ApiBearerAuth('JWT-auth')
+  @ApiOperation({
+    summary:
+      'Create or update many courses by slug (Admin). Used to sync scraped training data.',
+  })
+  @ApiResponse({
+    status: 201,
+    description: 'Inserted, updated and unchanged counts',
+  })
+  async upsertMany(
+    @Body('courses')
+    courses: Array<
+      Omit<CourseInput, 'startDate' | 'endDate'> & {
+        startDate?: string;
+        endDate?: string;
+      }
+    >,
+  ) {
+    if (
+      !Array.isArray(courses) ||
+      courses.some((c) => !c?.slug || !c?.title)
+    ) {
+      throw new BadRequestException(
+        'courses must be an array of courses with title and slug',
+      );
+    }
+    return this.coursesService.upsertMany(
+      courses.map(({ startDate, endDate, ...rest }) => ({
+        ...rest,
+        // Dates only when given: an undefined key would still reach $set.
+        ...(startDate && { startDate: parseDate(startDate, rest.slug) }),
+        ...(endDate && { endDate: parseDate(endDate, rest.slug) }),
+      })),
+    );
+  }
+
   @Get('admin/enrollments')
   @UseGuards(JwtAuthGuard, AdminGuard)
   @ApiBearerAuth('JWT-auth')
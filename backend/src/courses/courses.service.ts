@@ -5,6 +5,24 @@ import { Course } from './schemas/course.schema';
 import { CourseEnrollment } from './schemas/course-enrollment.schema';
 import { NotificationsService } from '../notifications/notifications.service';
 
+export type CourseInput = {
+  title: string;
+  description?: string;
+  slug: string;
+  isQualificationCourse?: boolean;
+  startDate?: Date;
+  endDate?: Date;
+  courseType?: string;
+  price?: string;
+  location?: string;
+  enrollmentLink?: string;
+  certification?: string;
+  targetAudience?: string;
+  prerequisites?: string;
+  sourceUrl?: string;
+  sourceUrls?: string[];
+};
+
 @Injectable()
 export class CoursesService {
   constructor(
@@ -14,22 +32,7 @@ export class CoursesService {
     private readonly notifications: NotificationsService,
   ) {}
 
-  async create(dto: {
-    title: string;
-    description?: string;
-    slug: string;
-    isQualificationCourse?: boolean;
-    startDate?: Date;
-    endDate?: Date;
-    courseType?: string;
-    price?: string;
-    location?: string;
-    enrollmentLink?: string;
-    certification?: string;
-    targetAudience?: string;
-    prerequisites?: string;
-    sourceUrl?: string;
-  }) {
+  async create(dto: CourseInput) {
     const existing = await this.courseModel.findOne({ slug: dto.slug }).exec();
     if (existing) {
       return this.findAll();
@@ -38,6 +41,33 @@ export class CoursesService {
     return this.findAll();
   }
 
+  /**
+   * Import many courses in one round trip (scraped data), keyed by slug. New slugs are
+   * inserted; existing courses get the scraped fields updated, while isQualificationCourse
+   * (an admin decision) is only set on creation. Returns counts rather than the whole catalog.
+   */
+  async upsertMany(dtos: CourseInput[]) {
+    if (dtos.length === 0) return { inserted: 0, updated: 0, unchanged: 0 };
+    const result = await this.courseModel.bulkWrite(
+      dtos.map(({ slug, isQualificationCourse, ...fields }) => ({
+        updateOne: {
+          filter: { slug },
+          update: {
+            $set: fields,
+            $setOnInsert: { isQualificationCourse: !!isQualificationCourse },
+          },
+          upsert: true,
+        },
+      })),
+      { ordered: false },
+    );
+    return {
+      inserted: result.upsertedCount,
+      updated: result.modifiedCount,
+      unchanged: dtos.length - result.upsertedCount - result.modifiedCount,
+    };
+  }
+
   async findAll(filters?: {
     qualificationOnly?: boolean;
     courseType?: string;
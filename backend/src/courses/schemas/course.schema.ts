@@ -48,6 +48,10 @@ export class Course {
   @Prop()
   sourceUrl?: string;
 
+  /** Every site listing the course, when cross-source duplicates were merged */
+  @Prop({ type: [String] })
+  sourceUrls?: string[];
+
   createdAt?: Date;
   updatedAt?: Date;
 }
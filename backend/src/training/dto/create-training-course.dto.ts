@@ -5,7 +5,14 @@ export class ContentSectionDto {
   title?: string;
   content?: string;
   imageUrl?: string;
+  imageWidth?: number;
+  imageHeight?: number;
+  imageHash?: string;
   videoUrl?: string;
+  videoTitle?: string;
+  videoDuration?: number;
+  thumbnailUrl?: string;
+  videoProvider?: string;
   definitions?: Record<string, string>;
   listItems?: string[];
   order?: number;
@@ -14,9 +14,34 @@ export class ContentSection {
   @Prop()
   imageUrl?: string;
 
+  /** For type 'image': pixel size of the thumbnail uploaded to imageUrl */
+  @Prop()
+  imageWidth?: number;
+
+  @Prop()
+  imageHeight?: number;
+
+  /** For type 'image': perceptual hash (hex), used as the Cloudinary publicId */
+  @Prop()
+  imageHash?: string;
+
   @Prop()
   videoUrl?: string;
 
+  /** For type 'video': provider metadata resolved at scrape time (oEmbed) */
+  @Prop()
+  videoTitle?: string;
+
+  /** Seconds */
+  @Prop()
+  videoDuration?: number;
+
+  @Prop()
+  thumbnailUrl?: string;
+
+  @Prop()
+  videoProvider?: string;
+
   /** For type 'definition': term -> definition */
   @Prop({ type: Map, of: String })
   definitions?: Record<string, string>;
@@ -6,8 +6,12 @@ import {
   Body,
   Param,
   UseGuards,
+  UseInterceptors,
+  UploadedFile,
+  BadRequestException,
   Request,
 } from '@nestjs/common';
+import { FileInterceptor } from '@nestjs/platform-express';
 import {
   ApiTags,
   ApiOperation,
@@ -128,6 +132,32 @@ export class TrainingController {
     return this.trainingService.create(dto);
   }
 
+  @Post('admin/images')
+  @UseGuards(JwtAuthGuard, AdminGuard)
+  @UseInterceptors(FileInterceptor('file'))
+  @ApiBearerAuth('JWT-auth')
+  @ApiOperation({
+    summary: 'Upload a scraped image thumbnail (multipart: file, hash)',
+  })
+  @ApiResponse({ status: 201, description: 'Returns { imageUrl }' })
+  @ApiResponse({ status: 400, description: 'No image file or invalid hash' })
+  async uploadCourseImage(
+    @UploadedFile() file?: { buffer: Buffer; mimetype: string },
+    @Body('hash') hash?: string,
+  ) {
+    if (!file || !file.buffer)
+      throw new BadRequestException('No file provided');
+    if (!(file.mimetype ?? '').toLowerCase().startsWith('image/'))
+      throw new BadRequestException('Invalid file type');
+    if (!hash || !/^[0-9a-f]{16}$/.test(hash))
+      throw new BadRequestException('hash must be 16 hex characters');
+    const imageUrl = await this.trainingService.uploadCourseImage(
+      file.buffer,
+      hash,
+    );
+    return { imageUrl };
+  }
+
   @Patch('admin/courses/:id')
   @UseGuards(JwtAuthGuard, AdminGuard)
   @ApiBearerAuth('JWT-auth')
@@ -2,6 +2,7 @@ import {
   Injectable,
   NotFoundException,
   BadRequestException,
+  ServiceUnavailableException,
   Inject,
   forwardRef,
 } from '@nestjs/common';
@@ -15,6 +16,7 @@ import { CreateTrainingCourseDto } from './dto/create-training-course.dto';
 import { UpdateTrainingCourseDto } from './dto/update-training-course.dto';
 import { ApproveTrainingCourseDto } from './dto/approve-training-course.dto';
 import { VolunteersService } from '../volunteers/volunteers.service';
+import { CloudinaryService } from '../cloudinary/cloudinary.service';
 
 const QUIZ_PASS_THRESHOLD_PERCENT = 80;
 
@@ -46,6 +48,7 @@ export class TrainingService {
     private readonly enrollmentModel: Model<TrainingEnrollment>,
     @Inject(forwardRef(() => VolunteersService))
     private readonly volunteersService: VolunteersService,
+    private readonly cloudinary: CloudinaryService,
   ) {}
 
   /** List courses approved for app (caregivers) — only approved, ordered; quiz answers stripped */
@@ -97,6 +100,20 @@ export class TrainingService {
     }
   }
 
+  /**
+   * Upload a scraped image thumbnail; the perceptual hash is the publicId, so
+   * re-uploading the same picture overwrites it instead of adding a copy.
+   */
+  async uploadCourseImage(buffer: Buffer, hash: string): Promise<string> {
+    if (!this.cloudinary.isConfigured()) {
+      throw new ServiceUnavailableException('Cloudinary is not configured');
+    }
+    return this.cloudinary.uploadBuffer(buffer, {
+      folder: 'cognicare/training',
+      publicId: hash,
+    });
+  }
+
   /** Create course (admin or scraper) */
   async create(dto: CreateTrainingCourseDto) {
     const created = await this.courseModel.create({
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+robots.txt lookup benchmark: robots_policy.RobotsPolicy vs urllib.robotparser.RobotFileParser.
+
+Checks the same URLs against one robots.txt and reports URLs/sec for:
+  - RobotFileParser parsed again for every URL (what scraper.py did, minus the download),
+  - RobotFileParser parsed once,
+  - RobotsPolicy compiled once.
+By default the robots.txt is generated (--rules rules over a few site sections, some with "*"
+/ "$", which RobotFileParser matches literally) and the URLs are drawn from the same sections.
+"differ" counts URLs where the two parsers decide differently: wildcard rules, and overlapping
+Allow / Disallow where RobotFileParser takes the first rule instead of the longest.
+
+Usage:
+  python bench_robots.py
+  python bench_robots.py --rules 400 --urls 50000
+  python bench_robots.py --robots robots.txt --url-file urls.txt --agent "CogniCare-Bot/1.0"
+"""
+
+import argparse
+import random
+import sys
+import time
+from urllib.robotparser import RobotFileParser
+
+from robots_policy import RobotsPolicy
+
+BASE = "https://example.org"
+SECTIONS = ["formations", "p", "actualites", "wp-admin", "search", "agenda", "media", "fr", "en", "ar"]
+
+
+def generate_robots(rules: int, rng: random.Random) -> str:
+    lines = ["User-agent: *"]
+    for i in range(rules):
+        section = rng.choice(SECTIONS)
+        kind = rng.random()
+        if kind < 0.15:
+            pattern = "/{}/*.{}$".format(section, rng.choice(["pdf", "php", "json"]))
+        elif kind < 0.25:
+            pattern = "/*?{}=".format(rng.choice(["replytocom", "share", "print", "sort"]))
+        else:
+            pattern = "/{}/{}".format(section, rng.randrange(rules * 4))
+        lines.append("{}: {}".format("Allow" if rng.random() < 0.3 else "Disallow", pattern))
+    lines.append("Disallow: /wp-admin/")
+    lines.append("Allow: /wp-admin/admin-ajax.php")
+    return "\n".join(lines) + "\n"
+
+
+def generate_urls(count: int, rules: int, rng: random.Random) -> list:
+    urls = []
+    for _ in range(count):
+        path = "/{}/{}".format(rng.choice(SECTIONS), rng.randrange(rules * 4))
+        roll = rng.random()
+        if roll < 0.1:
+            path += ".pdf"
+        elif roll < 0.2:
+            path += "?share=facebook"
+        elif roll < 0.3:
+            path += "/{}".format(rng.randrange(100))
+        urls.append(BASE + path)
+    return urls
+
+
+def robotfileparser(text: str) -> RobotFileParser:
+    rp = RobotFileParser(BASE + "/robots.txt")
+    rp.parse(text.splitlines())
+    return rp
+
+
+def rate(check, urls: list) -> tuple:
+    started = time.perf_counter()
+    decisions = [check(url) for url in urls]
+    return len(urls) / (time.perf_counter() - started), decisions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare RobotsPolicy with RobotFileParser in URLs/sec")
+    parser.add_argument("--robots", help="robots.txt file (default: generated)")
+    parser.add_argument("--url-file", help="One URL per line (default: generated)")
+    parser.add_argument("--rules", type=int, default=120, help="Rules in the generated robots.txt")
+    parser.add_argument("--urls", type=int, default=20000, help="Generated URLs")
+    parser.add_argument("--agent", default="CogniCare-Bot/1.0")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.robots:
+        with open(args.robots, encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = generate_robots(args.rules, rng)
+    if args.url_file:
+        with open(args.url_file, encoding="utf-8") as f:
+            urls = [line.strip() for line in f if line.strip()]
+    else:
+        urls = generate_urls(args.urls, args.rules, rng)
+
+    started = time.perf_counter()
+    policy = RobotsPolicy.parse(text)
+    compile_ms = (time.perf_counter() - started) * 1000
+    rp = robotfileparser(text)
+    # Re-parsing per URL is slow; a slice is enough for its rate.
+    reparse_urls = urls[:max(1, len(urls) // 20)]
+
+    results = [
+        ("RobotFileParser, parsed per URL", rate(lambda u: robotfileparser(text).can_fetch(args.agent, u), reparse_urls)),
+        ("RobotFileParser, parsed once", rate(lambda u: rp.can_fetch(args.agent, u), urls)),
+        ("RobotsPolicy, compiled once", rate(lambda u: policy.can_fetch(args.agent, u), urls)),
+    ]
+    print("{} URLs, {} robots.txt lines, compiled in {:.2f} ms".format(len(urls), len(text.splitlines()), compile_ms))
+    print("{:<34} {:>12}".format("", "URLs/sec"))
+    for label, (per_sec, _) in results:
+        print("{:<34} {:>12,.0f}".format(label, per_sec))
+    baseline, compiled = results[1][1][1], results[2][1][1]
+    differ = sum(a != b for a, b in zip(baseline, compiled))
+    print("speed-up vs parsed once: {:.1f}x; differ: {} of {} URLs".format(
+        results[2][1][0] / results[1][1][0], differ, len(urls)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
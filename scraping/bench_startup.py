@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Start-up benchmark for the scraper entry points, based on `python -X importtime`.
+
+Runs each case several times in a fresh interpreter and reports the median wall time and
+the median total import time (sum of the "self" column of -X importtime). The "eager"
+case imports every command module plus requests / bs4 / lxml up front, the way a single
+entry point without lazy imports would; the other cases go through cli.py.
+
+Usage:
+  python bench_startup.py
+  python bench_startup.py --runs 20 --top 15 cnfct     # also list the slowest imports of one command
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from cli import COMMANDS, SCRAPING_DIR, TRAINING_DIR
+
+CLI = str(SCRAPING_DIR / "cli.py")
+EAGER = (
+    "import sys; sys.path[:0] = [{!r}, {!r}]; "
+    "import requests, bs4, lxml.etree, soupsieve; "
+    "import {}"
+).format(str(SCRAPING_DIR), str(TRAINING_DIR), ", ".join(module for module, _, _ in COMMANDS.values()))
+
+
+def parse_importtime(stderr: str) -> dict:
+    """{module: (self_us, cumulative_us)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(argv: list, runs: int) -> dict:
+    walls, imports, counts = [], [], []
+    modules = {}
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime"] + argv, capture_output=True, text=True,
+                              cwd=str(SCRAPING_DIR))
+        walls.append((time.perf_counter() - started) * 1000)
+        modules = parse_importtime(proc.stderr)
+        imports.append(sum(s for s, _ in modules.values()) / 1000)
+        counts.append(len(modules))
+    return {
+        "wallMs": statistics.median(walls),
+        "importMs": statistics.median(imports),
+        "modules": int(statistics.median(counts)),
+        "last": modules,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure scraper start-up time with -X importtime")
+    parser.add_argument("command", nargs="?", help="Only this cli.py command (default: all)")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=0, help="Show the N slowest imports of each case")
+    args = parser.parse_args()
+
+    cases = [("python -c pass", ["-c", "pass"]), ("eager (all modules)", ["-c", EAGER]), ("cli.py", [CLI])]
+    commands = [args.command] if args.command else list(COMMANDS)
+    cases.extend(("cli.py {} --help".format(c), [CLI, c, "--help"]) for c in commands)
+
+    print("{:<36} {:>9} {:>10} {:>8}".format("case", "wall ms", "import ms", "modules"))
+    for label, argv in cases:
+        result = measure(argv, args.runs)
+        print("{:<36} {:>9.1f} {:>10.1f} {:>8}".format(label, result["wallMs"], result["importMs"], result["modules"]))
+        if args.top:
+            slowest = sorted(result["last"].items(), key=lambda kv: kv[1][0], reverse=True)[:args.top]
+            for name, (self_us, _) in slowest:
+                print("    {:>8.1f} ms  {}".format(self_us / 1000, name))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
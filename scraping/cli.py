@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the CogniCare scrapers and tools.
+
+Only the module of the requested command is imported (and, inside it, requests / bs4 /
+lxml only when actually needed), so short cron runs do not pay for every scraper's
+dependencies. The remaining arguments are passed to the command's own main().
+
+Usage:
+  python cli.py                                  # list commands
+  python cli.py cnfct --replay warc/
+  python cli.py crawl merge --fuzzy
+  python cli.py training --scrape-courses --out training_courses.json
+
+See bench_startup.py for the start-up benchmark.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+SCRAPING_DIR = Path(__file__).resolve().parent
+TRAINING_DIR = SCRAPING_DIR.parent / "scripts" / "autism_training_scraper"
+
+# command -> (module, directory, summary)
+COMMANDS = {
+    "autisme-tunisie": ("scrape_autisme_tunisie", SCRAPING_DIR, "Scrape autisme-tunisie.org courses"),
+    "cnfct": ("scrape_cnfct", SCRAPING_DIR, "Scrape cnfct.nat.tn courses"),
+    "femmes-gov-tn": ("scrape_femmes_gov_tn", SCRAPING_DIR, "Scrape femmes.gov.tn courses"),
+    "example": ("scrape_example", SCRAPING_DIR, "Example scraper template"),
+    "crawl": ("crawl_workers", SCRAPING_DIR, "Multi-worker crawl: seed, work, merge, serve"),
+    "dedupe": ("dedupe_courses", SCRAPING_DIR, "Merge duplicate courses across sources"),
+    "validate-links": ("validate_links", SCRAPING_DIR, "Check catalog links"),
+    "upload": ("upload_courses", SCRAPING_DIR, "Upload courses to the CogniCare API"),
+    "loadtest": ("loadtest", SCRAPING_DIR, "Load-test the scrapers against stand-in sites"),
+    "standin": ("standin_sites", SCRAPING_DIR, "Serve a stand-in site, courses API or oEmbed provider"),
+    "training": ("scraper", TRAINING_DIR, "Scrape autism training content (training module)"),
+    "documents": ("documents", TRAINING_DIR, "Ingest PDF/office training documents"),
+    "images": ("images", TRAINING_DIR, "Thumbnail and deduplicate the images of training courses"),
+    "scrape-service": ("scrape_service", TRAINING_DIR, "On-demand scrape_url() HTTP service"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = ["usage: cli.py <command> [args...]", "", "commands:"]
+    lines.extend("  {}  {}".format(name.ljust(width), summary) for name, (_, _, summary) in COMMANDS.items())
+    lines.append("")
+    lines.append("Run 'cli.py <command> --help' for the options of a command.")
+    return "\n".join(lines)
+
+
+def run(command: str, args: list) -> int:
+    module_name, directory, _ = COMMANDS[command]
+    if str(directory) not in sys.path:
+        sys.path.insert(0, str(directory))
+    module = importlib.import_module(module_name)
+    sys.argv = ["cli.py {}".format(command)] + args
+    return module.main() or 0
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print(usage())
+        return 0
+    command = sys.argv[1]
+    if command not in COMMANDS:
+        print("unknown command {!r}\n\n{}".format(command, usage()), file=sys.stderr)
+        return 2
+    return run(command, sys.argv[2:])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Multi-worker crawl over a shared lease-based frontier (see frontier.py).
+
+Several worker processes, on one node or many, lease URLs from the same frontier,
+fetch them, parse courses with the source's extraction rules (rules/*.json), add the
+same-host pages those rules follow (pagination by default) and store the results back.
+A 4xx other than 408 / 429 fails a URL at once; other errors are retried. Per-host
+politeness is enforced by the frontier, so it holds across all workers; each worker fetches
+a host's robots.txt once and skips disallowed URLs (robots_policy.py), retrying them later
+when robots.txt itself is unavailable. `merge` then writes one catalog deduplicated by slug
+and, with --fuzzy, merges the same course listed by several sources (see dedupe_courses.py).
+
+Usage:
+  python crawl_workers.py seed                          # seedPaths of every source
+  python crawl_workers.py work --workers 4              # local SQLite frontier
+  python crawl_workers.py merge
+  # multi-node: expose the frontier on one node, point workers at it elsewhere
+  python crawl_workers.py serve --port 8770
+  python crawl_workers.py work --frontier http://crawl-host:8770 --workers 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin
+
+from dedupe_courses import DEFAULT_THRESHOLD, resolve_duplicates
+from frontier import FrontierStore, HttpFrontier, SqliteFrontier, serve
+from robots_policy import RobotsCache
+from site_rules import available_sources, discover_links, load_rules, parse_courses
+
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+DEFAULT_FRONTIER = OUTPUT_DIR / "frontier.sqlite3"
+USER_AGENT = "CogniCare-Bot/1.0 (training catalog; +https://cognicare.app)"
+REQUEST_DELAY_SEC = 2
+# 4xx answers worth another attempt (timeout, throttling); any other 4xx fails at once.
+RETRYABLE_CLIENT_STATUSES = (408, 429)
+
+
+def open_frontier(spec) -> FrontierStore:
+    """An http(s):// URL opens a remote frontier, anything else a local SQLite file."""
+    spec = str(spec)
+    if spec.startswith(("http://", "https://")):
+        return HttpFrontier(spec)
+    return SqliteFrontier(spec)
+
+
+def seed_entries(sources: list, base_url: str = None) -> list:
+    """(url, source) for the seedPaths of each source's rules."""
+    entries = []
+    for source in sources:
+        rules = load_rules(source)
+        base = base_url or rules.base_url
+        entries.extend((urljoin(base, path), source) for path in rules.seed_paths)
+    return entries
+
+
+def _retry_after(response) -> float:
+    value = response.headers.get("Retry-After", "")
+    try:
+        return float(value)
+    except ValueError:
+        return float(REQUEST_DELAY_SEC)
+
+
+def run_worker(frontier_spec: str, worker_id: str, lease_sec: float, host_delay: float, max_attempts: int) -> int:
+    """Lease, fetch and parse until the frontier is exhausted; returns pages completed."""
+    try:
+        import requests
+    except ImportError:
+        print("Install dependencies: pip install -r requirements.txt")
+        sys.exit(1)
+
+    store = open_frontier(frontier_spec)
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+
+    def get_robots_txt(robots_url: str) -> tuple:
+        r = session.get(robots_url, timeout=15)
+        return r.status_code, r.text
+
+    robots = RobotsCache(get_robots_txt)
+    done = 0
+    while True:
+        lease = store.lease(worker_id, lease_sec, host_delay, max_attempts)
+        if lease is None:
+            return done
+        if "wait" in lease:
+            # Re-poll at least every second: leased URLs usually complete long before expiry.
+            time.sleep(min(max(lease["wait"], 0.01), 1.0))
+            continue
+        url, source = lease["url"], lease["source"]
+        policy = robots.policy(url)
+        if not policy.can_fetch(USER_AGENT, url):
+            if policy.error:
+                # robots.txt unavailable (5xx / unreachable): hold the host and retry later.
+                store.fail(url, worker_id, "robots.txt unavailable", robots.error_ttl_sec, max_attempts)
+                continue
+            print("Skip (robots.txt): {}".format(url), file=sys.stderr)
+            store.complete(url, worker_id, [])
+            continue
+        try:
+            r = session.get(url, timeout=15)
+            if r.status_code in (429, 503):
+                store.fail(url, worker_id, "HTTP {}".format(r.status_code), _retry_after(r), max_attempts)
+                continue
+            if 400 <= r.status_code < 500 and r.status_code not in RETRYABLE_CLIENT_STATUSES:
+                print("HTTP {}: {}".format(r.status_code, url), file=sys.stderr)
+                store.fail(url, worker_id, "HTTP {}".format(r.status_code), None, max_attempts=1)
+                continue
+            r.raise_for_status()
+            courses = parse_courses(r.content, url, source)
+            links = discover_links(r.content, r.url, source)
+        except Exception as e:
+            print("Fetch error {}: {}".format(url, e), file=sys.stderr)
+            store.fail(url, worker_id, str(e), None, max_attempts)
+            continue
+        if links:
+            store.add([(link, source) for link in links])
+        store.complete(url, worker_id, courses)
+        done += 1
+
+
+def _worker_main(args_tuple):
+    return run_worker(*args_tuple)
+
+
+def work(frontier_spec: str, workers: int, lease_sec: float, host_delay: float, max_attempts: int) -> int:
+    """Run `workers` worker processes on this node; returns pages completed."""
+    node = "{}-{}".format(socket.gethostname(), os.getpid())
+    jobs = [(str(frontier_spec), "{}-w{}".format(node, i), lease_sec, host_delay, max_attempts) for i in range(workers)]
+    if workers == 1:
+        return _worker_main(jobs[0])
+    with multiprocessing.Pool(workers) as pool:
+        return sum(pool.map(_worker_main, jobs))
+
+
+def merge(store: FrontierStore, fuzzy_threshold: float = None) -> dict:
+    """One catalog from every worker's results, first occurrence of each slug wins.
+
+    With fuzzy_threshold, cross-source duplicates are also merged (resolve_duplicates).
+    """
+    courses = []
+    seen = set()
+    sources = set()
+    for _url, source, page_courses in store.results():
+        sources.add(source)
+        for c in page_courses:
+            if c["slug"] in seen:
+                continue
+            seen.add(c["slug"])
+            courses.append(c)
+    if fuzzy_threshold is not None:
+        courses = resolve_duplicates(courses, fuzzy_threshold)
+    return {
+        "courses": courses,
+        "scrapedAt": datetime.utcnow().isoformat() + "Z",
+        "source": "merged",
+        "sources": sorted(sources),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed course crawl over a shared frontier")
+    parser.add_argument("--frontier", default=str(DEFAULT_FRONTIER), help="SQLite path or http://host:port of a served frontier")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_seed = sub.add_parser("seed", help="Add entry URLs to the frontier")
+    p_seed.add_argument("--source", action="append", choices=available_sources(), help="Source(s) to seed (default: all)")
+    p_seed.add_argument("--base-url", help="Override the sources' baseUrl (e.g. a local stand-in site)")
+    p_seed.add_argument("--url", action="append", default=[], help="Extra URL for --source (repeatable)")
+
+    p_work = sub.add_parser("work", help="Run worker processes until the frontier is empty")
+    p_work.add_argument("--workers", type=int, default=4)
+    p_work.add_argument("--lease-sec", type=float, default=60, help="Lease duration before a URL is handed to another worker")
+    p_work.add_argument("--host-delay", type=float, default=REQUEST_DELAY_SEC, help="Min seconds between fetches to one host (all workers)")
+    p_work.add_argument("--max-attempts", type=int, default=3)
+
+    p_merge = sub.add_parser("merge", help="Write the merged catalog")
+    p_merge.add_argument("--out", type=Path, help="Output file (default: output/courses_merged_<timestamp>.json)")
+    p_merge.add_argument("--fuzzy", type=float, nargs="?", const=DEFAULT_THRESHOLD, metavar="THRESHOLD",
+                         help="Also merge similar courses across sources (similarity 0-1, default %(const)s)")
+
+    p_serve = sub.add_parser("serve", help="Expose the local SQLite frontier to workers on other nodes")
+    p_serve.add_argument("--host", default="0.0.0.0")
+    p_serve.add_argument("--port", type=int, default=8770)
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = serve(SqliteFrontier(args.frontier), args.host, args.port)
+        print("Serving frontier {} on {}:{}".format(args.frontier, args.host, args.port))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    store = open_frontier(args.frontier)
+    if args.command == "seed":
+        sources = args.source or available_sources()
+        entries = seed_entries(sources, args.base_url)
+        if args.url:
+            if len(sources) != 1:
+                parser.error("--url needs exactly one --source")
+            entries.extend((url, sources[0]) for url in args.url)
+        print("Added {} URL(s); frontier {}".format(store.add(entries), store.counts()))
+    elif args.command == "work":
+        started = time.perf_counter()
+        done = work(args.frontier, args.workers, args.lease_sec, args.host_delay, args.max_attempts)
+        print("Completed {} page(s) in {:.1f}s; frontier {}".format(done, time.perf_counter() - started, store.counts()))
+    elif args.command == "merge":
+        out = merge(store, args.fuzzy)
+        OUTPUT_DIR.mkdir(exist_ok=True)
+        filename = args.out or OUTPUT_DIR / "courses_merged_{}.json".format(datetime.utcnow().strftime("%Y%m%d_%H%M"))
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(out, f, ensure_ascii=False, indent=2)
+        print("Written {} course(s) from {} to {}".format(len(out["courses"]), ", ".join(out["sources"]), filename))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
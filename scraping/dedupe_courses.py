@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Cross-source course deduplication (entity resolution) for the merged catalog.
+
+The same training is often listed by several sites under slightly different titles, so
+slug equality misses it. Courses are grouped by blocking keys (distinctive normalized
+title tokens, start date, organiser) and only pairs sharing a block are compared,
+which keeps the work near-linear. Pairs scoring above a threshold on fuzzy title
+similarity (token overlap + character similarity) are clustered best pair first, with
+complete linkage: two clusters join only if every course of one matches every course of
+the other, so A~B and B~C does not pull in an unrelated C. A source never lists the same
+course twice, so courses from the same site (host of sourceUrl) are never merged. Each
+cluster becomes one canonical course that keeps every sourceUrl. Titles with different
+numbers ("niveau 1" / "niveau II", "phase 2") are never merged.
+
+Usage:
+  python dedupe_courses.py output/courses_*.json --out output/courses_deduped.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import unicodedata
+from collections import defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+STOPWORDS = frozenset(
+    "a au aux avec d de des du en et l la le les pour sur un une dans par the of and for to in on with".split()
+)
+# Tokens in more than this many courses say nothing about identity ("formation", "autisme").
+MAX_BLOCK_SIZE = 50
+DEFAULT_THRESHOLD = 0.82
+# Course fields naming the organiser, in order of preference.
+ORGANISER_FIELDS = ("organizer", "organiser", "provider", "organisation", "organization")
+ROMAN_NUMERALS = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10}
+
+
+def normalize_title(title: str) -> str:
+    text = unicodedata.normalize("NFKD", title or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return re.sub(r"[^\w]+", " ", text).strip()
+
+
+def _number(token: str) -> Optional[int]:
+    if token.isdigit():
+        return int(token)
+    return ROMAN_NUMERALS.get(token)
+
+
+def title_tokens(title: str) -> frozenset:
+    """Distinctive title tokens; numbers are kept (roman numerals as digits) even when one character long."""
+    tokens = set()
+    for t in normalize_title(title).split():
+        number = _number(t)
+        if number is not None:
+            tokens.add(str(number))
+        elif t not in STOPWORDS and len(t) > 1:
+            tokens.add(t)
+    return frozenset(tokens)
+
+
+def title_numbers(tokens: frozenset) -> frozenset:
+    """Level / phase / session numbers of a title, roman numerals as integers."""
+    return frozenset(n for n in map(_number, tokens) if n is not None)
+
+
+def _host(url: str) -> str:
+    host = urlparse(url or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def organiser(course: dict) -> str:
+    """
+    Normalized organiser shared by every source listing the course: the organiser / provider
+    field when scraped, else the host of an external enrollment link (e.g. a registration
+    platform). The source site itself says nothing, as each source lists its own URLs.
+    """
+    for field in ORGANISER_FIELDS:
+        if course.get(field):
+            return normalize_title(str(course[field]))
+    enrollment = _host(course.get("enrollmentLink"))
+    if enrollment and enrollment != _host(course.get("sourceUrl")):
+        return enrollment
+    return ""
+
+
+def blocking_keys(course: dict, tokens: frozenset) -> set:
+    keys = {("tok", t) for t in tokens if len(t) >= 4}
+    if course.get("startDate"):
+        keys.add(("date", str(course["startDate"])[:10]))
+    org = organiser(course)
+    if org:
+        keys.add(("org", org))
+    return keys
+
+
+def similarity(a: dict, b: dict, tokens_a: frozenset, tokens_b: frozenset) -> float:
+    """0..1 title similarity; 0 when both courses have different start dates or title numbers."""
+    da, db = a.get("startDate"), b.get("startDate")
+    if da and db and str(da)[:10] != str(db)[:10]:
+        return 0.0
+    if title_numbers(tokens_a) != title_numbers(tokens_b):
+        return 0.0
+    if not tokens_a or not tokens_b:
+        return 0.0
+    jaccard = len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+    chars = SequenceMatcher(None, " ".join(sorted(tokens_a)), " ".join(sorted(tokens_b))).ratio()
+    return 0.5 * jaccard + 0.5 * chars
+
+
+def candidate_pairs(courses: list, tokens: list) -> set:
+    """Index pairs sharing at least one block; oversized blocks are skipped."""
+    blocks = defaultdict(list)
+    for i, course in enumerate(courses):
+        for key in blocking_keys(course, tokens[i]):
+            blocks[key].append(i)
+    pairs = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                pairs.add((members[x], members[y]))
+    return pairs
+
+
+def course_sources(course: dict) -> frozenset:
+    """Sites listing the course: hosts of its sourceUrls (or sourceUrl)."""
+    urls = course.get("sourceUrls") or [course.get("sourceUrl")]
+    return frozenset(h for h in map(_host, urls) if h)
+
+
+def _richness(course: dict) -> tuple:
+    filled = sum(1 for v in course.values() if v not in (None, "", []))
+    return filled, len(course.get("description") or "")
+
+
+def merge_cluster(cluster: list) -> dict:
+    """Canonical course: the richest record, gaps filled from the others, all sourceUrls kept."""
+    ordered = sorted(cluster, key=_richness, reverse=True)
+    canonical = dict(ordered[0])
+    for other in ordered[1:]:
+        for key, value in other.items():
+            if canonical.get(key) in (None, "") and value not in (None, ""):
+                canonical[key] = value
+    urls = []
+    for course in cluster:
+        urls.extend(course.get("sourceUrls") or [course.get("sourceUrl")])
+    canonical["sourceUrls"] = [u for u in dict.fromkeys(urls) if u]
+    if len(cluster) > 1:
+        canonical["mergedSlugs"] = [c["slug"] for c in cluster if c["slug"] != canonical["slug"]]
+    return canonical
+
+
+def resolve_duplicates(courses: list, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Return courses with fuzzy duplicates merged, in first-seen order."""
+    tokens = [title_tokens(c.get("title", "")) for c in courses]
+    scores = {}
+    for i, j in candidate_pairs(courses, tokens):
+        score = similarity(courses[i], courses[j], tokens[i], tokens[j])
+        if score >= threshold:
+            scores[i, j] = score
+
+    def matches(i: int, j: int) -> bool:
+        pair = (i, j) if i < j else (j, i)
+        if pair not in scores:
+            scores[pair] = similarity(courses[i], courses[j], tokens[i], tokens[j])
+        return scores[pair] >= threshold
+
+    cluster_of = list(range(len(courses)))
+    members = {i: [i] for i in range(len(courses))}
+    sources = {i: course_sources(c) for i, c in enumerate(courses)}
+    for i, j in sorted(scores, key=lambda pair: (-scores[pair], pair)):
+        a, b = cluster_of[i], cluster_of[j]
+        if a == b or sources[a] & sources[b]:
+            continue
+        if not all(matches(x, y) for x in members[a] for y in members[b]):
+            continue
+        if len(members[a]) < len(members[b]):
+            a, b = b, a
+        for x in members[b]:
+            cluster_of[x] = a
+        members[a].extend(members.pop(b))
+        sources[a] |= sources.pop(b)
+    ordered = sorted((sorted(m) for m in members.values()), key=lambda m: m[0])
+    return [merge_cluster([courses[i] for i in m]) for m in ordered]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge duplicate courses across sources")
+    parser.add_argument("files", nargs="+", type=Path, help="Scraper output files")
+    parser.add_argument("--out", type=Path, help="Output file (default: output/courses_deduped_<timestamp>.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Similarity needed to merge (0-1)")
+    args = parser.parse_args()
+
+    courses = []
+    seen = set()
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        for c in data.get("courses", []) if isinstance(data, dict) else data:
+            if c.get("slug") and c["slug"] not in seen:
+                seen.add(c["slug"])
+                courses.append(c)
+    merged = resolve_duplicates(courses, args.threshold)
+    out = {"courses": merged, "scrapedAt": datetime.utcnow().isoformat() + "Z", "source": "deduped"}
+    filename = args.out or Path(__file__).resolve().parent / "output" / "courses_deduped_{}.json".format(
+        datetime.utcnow().strftime("%Y%m%d_%H%M"))
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(out, f, ensure_ascii=False, indent=2)
+    print("{} course(s) -> {} after merging duplicates; written to {}".format(len(courses), len(merged), filename))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""
+Shared crawl frontier with time-limited leases.
+
+Workers lease one URL at a time; a lease that is not completed before it expires makes
+the URL available again, so a crashed worker never loses work. Every lease counts as an
+attempt, so a URL that keeps crashing its workers is marked failed after max_attempts. Per-host politeness is
+enforced by the store itself (each lease pushes the host's next allowed fetch time),
+so the rate limit holds across every worker sharing the frontier.
+
+Stores:
+  SqliteFrontier  a SQLite file in WAL mode, shared by worker processes on one node
+  HttpFrontier    client for a store exposed with serve() (multi-node, or a local stand-in)
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import urlparse
+
+
+class FrontierStore:
+    """Interface shared by frontier stores."""
+
+    def add(self, entries: list) -> int:
+        """Add (url, source) pairs; URLs already known are ignored. Returns the number added."""
+        raise NotImplementedError
+
+    def lease(self, worker: str, lease_sec: float, host_delay: float, max_attempts: int = 3) -> Optional[dict]:
+        """
+        Lease the next fetchable URL for worker; expired leases of URLs already leased
+        max_attempts times are marked failed instead of being handed out again.
+        Returns {"url", "source"}; {"wait": seconds} when every remaining URL is leased or
+        waiting on its host's rate limit; None when the crawl is finished.
+        """
+        raise NotImplementedError
+
+    def complete(self, url: str, worker: str, courses: list):
+        raise NotImplementedError
+
+    def fail(self, url: str, worker: str, error: str, retry_after: Optional[float] = None, max_attempts: int = 3):
+        """Release a lease after a failed fetch; the URL is retried until max_attempts."""
+        raise NotImplementedError
+
+    def counts(self) -> dict:
+        raise NotImplementedError
+
+    def results(self) -> Iterator[tuple]:
+        """Yield (url, source, courses) for every completed URL, in insertion order."""
+        raise NotImplementedError
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    host TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    lease_owner TEXT,
+    lease_expires REAL NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    payload BLOB
+);
+CREATE INDEX IF NOT EXISTS urls_state ON urls (state, not_before);
+CREATE TABLE IF NOT EXISTS hosts (
+    host TEXT PRIMARY KEY,
+    next_allowed REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class SqliteFrontier(FrontierStore):
+    """Frontier in a SQLite WAL file; safe across threads and processes on one node."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self):
+        """BEGIN IMMEDIATE: serializes writers so lease decisions are atomic."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def add(self, entries: list) -> int:
+        conn = self._write()
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO urls (url, source, host) VALUES (?, ?, ?)",
+                [(url, source, urlparse(url).netloc) for url, source in entries],
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def lease(self, worker: str, lease_sec: float, host_delay: float, max_attempts: int = 3) -> Optional[dict]:
+        now = time.time()
+        conn = self._write()
+        try:
+            conn.execute(
+                """
+                UPDATE urls SET state = 'failed', lease_owner = NULL, error = 'lease expired'
+                WHERE state = 'leased' AND lease_expires <= ? AND attempts >= ?
+                """,
+                (now, max_attempts),
+            )
+            row = conn.execute(
+                """
+                SELECT u.url, u.source, u.host FROM urls u LEFT JOIN hosts h ON h.host = u.host
+                WHERE (u.state = 'pending' OR (u.state = 'leased' AND u.lease_expires <= :now))
+                  AND u.not_before <= :now AND COALESCE(h.next_allowed, 0) <= :now
+                ORDER BY u.rowid LIMIT 1
+                """,
+                {"now": now},
+            ).fetchone()
+            if row is None:
+                wait = conn.execute(
+                    """
+                    SELECT MIN(MAX(u.not_before, COALESCE(h.next_allowed, 0),
+                                   CASE WHEN u.state = 'leased' THEN u.lease_expires ELSE 0 END))
+                    FROM urls u LEFT JOIN hosts h ON h.host = u.host
+                    WHERE u.state IN ('pending', 'leased')
+                    """
+                ).fetchone()[0]
+                conn.execute("COMMIT")
+                return None if wait is None else {"wait": max(0.0, wait - now)}
+            url, source, host = row
+            conn.execute(
+                "UPDATE urls SET state = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE url = ?",
+                (worker, now + lease_sec, url),
+            )
+            conn.execute(
+                "INSERT INTO hosts (host, next_allowed) VALUES (?, ?) "
+                "ON CONFLICT (host) DO UPDATE SET next_allowed = excluded.next_allowed",
+                (host, now + host_delay),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return {"url": url, "source": source}
+
+    def complete(self, url: str, worker: str, courses: list):
+        payload = zlib.compress(json.dumps(courses, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        conn = self._write()
+        try:
+            # A worker whose lease expired may still finish; the first result wins.
+            conn.execute(
+                "UPDATE urls SET state = 'done', payload = ?, lease_owner = ?, error = NULL WHERE url = ? AND state != 'done'",
+                (payload, worker, url),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def fail(self, url: str, worker: str, error: str, retry_after: Optional[float] = None, max_attempts: int = 3):
+        now = time.time()
+        conn = self._write()
+        try:
+            row = conn.execute("SELECT attempts, host FROM urls WHERE url = ? AND state = 'leased' AND lease_owner = ?",
+                               (url, worker)).fetchone()
+            if row is not None:
+                attempts, host = row
+                state = "failed" if attempts >= max_attempts else "pending"
+                backoff = retry_after if retry_after is not None else 2 ** attempts
+                conn.execute(
+                    "UPDATE urls SET state = ?, error = ?, lease_owner = NULL, not_before = ? WHERE url = ?",
+                    (state, error[:500], now + backoff, url),
+                )
+                if retry_after is not None:
+                    # The server asked us to slow down: hold the whole host, not just this URL.
+                    conn.execute(
+                        "UPDATE hosts SET next_allowed = MAX(next_allowed, ?) WHERE host = ?", (now + retry_after, host),
+                    )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def counts(self) -> dict:
+        rows = self._conn().execute("SELECT state, COUNT(*) FROM urls GROUP BY state").fetchall()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def results(self) -> Iterator[tuple]:
+        rows = self._conn().execute("SELECT url, source, payload FROM urls WHERE state = 'done' ORDER BY rowid")
+        for url, source, payload in rows:
+            yield url, source, json.loads(zlib.decompress(payload))
+
+
+class HttpFrontier(FrontierStore):
+    """Client for a frontier exposed with serve()."""
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        try:
+            import requests
+        except ImportError:
+            raise RuntimeError("Install dependencies: pip install -r requirements.txt") from None
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path: str, body: dict):
+        r = self.session.post(self.base_url + path, json=body, timeout=self.timeout)
+        r.raise_for_status()
+        return r.json()
+
+    def add(self, entries: list) -> int:
+        return self._post("/add", {"entries": [list(e) for e in entries]})["added"]
+
+    def lease(self, worker: str, lease_sec: float, host_delay: float, max_attempts: int = 3) -> Optional[dict]:
+        return self._post("/lease", {"worker": worker, "leaseSec": lease_sec, "hostDelay": host_delay,
+                                     "maxAttempts": max_attempts})["lease"]
+
+    def complete(self, url: str, worker: str, courses: list):
+        self._post("/complete", {"url": url, "worker": worker, "courses": courses})
+
+    def fail(self, url: str, worker: str, error: str, retry_after: Optional[float] = None, max_attempts: int = 3):
+        self._post("/fail", {"url": url, "worker": worker, "error": error,
+                             "retryAfter": retry_after, "maxAttempts": max_attempts})
+
+    def counts(self) -> dict:
+        return self._post("/counts", {})
+
+    def results(self) -> Iterator[tuple]:
+        for url, source, courses in self._post("/results", {})["results"]:
+            yield url, source, courses
+
+
+def _handler_for(store: FrontierStore):
+    routes = {
+        "/add": lambda b: {"added": store.add([tuple(e) for e in b["entries"]])},
+        "/lease": lambda b: {"lease": store.lease(b["worker"], b["leaseSec"], b["hostDelay"], b.get("maxAttempts", 3))},
+        "/complete": lambda b: store.complete(b["url"], b["worker"], b["courses"]) or {},
+        "/fail": lambda b: store.fail(b["url"], b["worker"], b["error"], b.get("retryAfter"), b.get("maxAttempts", 3)) or {},
+        "/counts": lambda b: store.counts(),
+        "/results": lambda b: {"results": list(store.results())},
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            route = routes.get(self.path)
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                status, payload = (200, route(body)) if route else (404, {"message": "Not Found"})
+            except (ValueError, KeyError, TypeError) as e:
+                status, payload = 400, {"message": "Bad Request: {!r}".format(e)}
+            except Exception as e:
+                # A store error: answer instead of dropping the connection.
+                print("Frontier error on {}:".format(self.path), file=sys.stderr)
+                traceback.print_exc()
+                status, payload = 500, {"message": str(e)}
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(store: FrontierStore, host: str = "127.0.0.1", port: int = 8770) -> ThreadingHTTPServer:
+    """Expose store over HTTP/JSON for HttpFrontier clients (call serve_forever() on the result)."""
+    server = ThreadingHTTPServer((host, port), _handler_for(store))
+    server.daemon_threads = True
+    return server
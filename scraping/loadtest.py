@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Crawl load test against local stand-in sites (see standin_sites.py).
+
+Starts one synthetic site per profile, points the existing scraper entry points at
+it (scrape_autisme_tunisie / scrape for the Tunisian sites, scrape_url for the WHO
+and NAS training pages), crawls every page and reports throughput and tail latency.
+No real site is contacted and REQUEST_DELAY sleeps are disabled.
+
+Usage:
+  python loadtest.py --site cnfct --site who --pages 5000 --workers 16 --latency-ms 20 --error-rate 0.01
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from standin_sites import PROFILES, StandinServer, add_site_arguments, site_config_from_args
+
+TRAINING_SCRAPER_DIR = Path(__file__).resolve().parent.parent / "scripts" / "autism_training_scraper"
+
+# profile -> (module, end-to-end entry point)
+TUNISIAN_SCRAPERS = {
+    "autisme-tunisie": ("scrape_autisme_tunisie", "scrape_autisme_tunisie"),
+    "cnfct": ("scrape_cnfct", "scrape"),
+    "femmes-gov-tn": ("scrape_femmes_gov_tn", "scrape"),
+}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def _tunisian_crawler(profile: str, server: StandinServer):
+    try:
+        import requests
+    except ImportError:
+        print("Install dependencies: pip install -r requirements.txt")
+        sys.exit(1)
+
+    module_name, entry = TUNISIAN_SCRAPERS[profile]
+    mod = importlib.import_module(module_name)
+    mod.BASE_URL = server.base_url
+    mod.REQUEST_DELAY_SEC = 0
+    entry_courses = getattr(mod, entry)()
+    session = requests.Session()
+    session.headers["User-Agent"] = mod.USER_AGENT
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=64)
+    session.mount("http://", adapter)
+
+    def crawl(url: str) -> int:
+        html = mod.fetch_page(url, session)
+        if html is None:
+            return -1
+        return len(mod.parse_courses_from_html(html, url))
+
+    return crawl, len(entry_courses)
+
+
+def _training_crawler(server: StandinServer):
+    if str(TRAINING_SCRAPER_DIR) not in sys.path:
+        sys.path.insert(0, str(TRAINING_SCRAPER_DIR))
+    scraper = importlib.import_module("scraper")
+    scraper.REQUEST_DELAY = 0
+
+    def crawl(url: str) -> int:
+        course = scraper.scrape_url(url)
+        if course is None:
+            return -1
+        return len(course["contentSections"])
+
+    entry = crawl(server.base_url + "/")
+    return crawl, max(entry, 0)
+
+
+def run_site(profile: str, args: argparse.Namespace) -> dict:
+    """Crawl every page of one stand-in site and return the measurements."""
+    config = site_config_from_args(profile, args)
+    with StandinServer(config) as server:
+        if profile in TUNISIAN_SCRAPERS:
+            crawl, entry_items = _tunisian_crawler(profile, server)
+        else:
+            crawl, entry_items = _training_crawler(server)
+        urls = [server.page_url(i) for i in range(config.pages)]
+        latencies = []
+        failures = 0
+        items = 0
+
+        def timed(url: str):
+            t0 = time.perf_counter()
+            n = crawl(url)
+            return time.perf_counter() - t0, n
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            for elapsed, n in pool.map(timed, urls):
+                latencies.append(elapsed)
+                if n < 0:
+                    failures += 1
+                else:
+                    items += n
+        wall = time.perf_counter() - started
+        served = server.stats.snapshot()
+    latencies.sort()
+    return {
+        "site": profile,
+        "pages": len(urls),
+        "failed": failures,
+        "items": items,
+        "entryItems": entry_items,
+        "wallSec": wall,
+        "pagesPerSec": len(urls) / wall if wall else 0.0,
+        "p50Ms": percentile(latencies, 50) * 1000,
+        "p95Ms": percentile(latencies, 95) * 1000,
+        "p99Ms": percentile(latencies, 99) * 1000,
+        "maxMs": (latencies[-1] if latencies else 0.0) * 1000,
+        "served": served,
+    }
+
+
+def print_report(results: list):
+    header = "{:<16} {:>7} {:>7} {:>8} {:>9} {:>8} {:>8} {:>8} {:>8}".format(
+        "site", "pages", "failed", "items", "pages/s", "p50 ms", "p95 ms", "p99 ms", "max ms")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print("{:<16} {:>7} {:>7} {:>8} {:>9.1f} {:>8.1f} {:>8.1f} {:>8.1f} {:>8.1f}".format(
+            r["site"], r["pages"], r["failed"], r["items"], r["pagesPerSec"],
+            r["p50Ms"], r["p95Ms"], r["p99Ms"], r["maxMs"]))
+    for r in results:
+        print("{}: entry point parsed {} item(s); server {}".format(r["site"], r["entryItems"], r["served"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the scrapers against local stand-in sites")
+    parser.add_argument("--site", action="append", choices=PROFILES, help="Site profile to crawl (repeatable; default: all)")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent fetches")
+    parser.add_argument("--parse-cache", action="store_true", help="Keep the parse cache on (off by default so every page is parsed)")
+    add_site_arguments(parser)
+    args = parser.parse_args()
+    if not args.parse_cache:
+        os.environ["COGNICARE_PARSE_CACHE"] = "off"
+    if args.pages > 100_000:
+        parser.error("--pages is limited to 100000")
+    results = [run_site(profile, args) for profile in (args.site or PROFILES)]
+    print_report(results)
+    return 0 if all(r["failed"] < r["pages"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
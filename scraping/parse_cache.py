@@ -0,0 +1,200 @@
+"""
+Cache of parse results keyed by page content.
+
+Entries are keyed by (SHA-256 of the raw response bytes, extractor name, extractor version,
+context) and hold the extracted data as zlib-compressed compact JSON in a SQLite file.
+Callers pass the undecoded body, so a cache hit costs neither charset detection nor
+BeautifulSoup, and the key does not depend on how the body would be decoded. Bumping an
+extractor's version makes its old entries unreachable (and they are purged on first use),
+leaving other extractors' entries intact.
+
+Each entry records when it was last used: entries unused for max_age_sec are dropped, and
+beyond max_entries rows or max_bytes of payload the least recently used go first. Trimming
+runs on put, every TRIM_EVERY writes.
+
+Set COGNICARE_PARSE_CACHE to a file path to relocate the cache, or to "off" to disable it.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "cache" / "parse_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_AGE_SEC = 30 * 24 * 3600
+# Hits refresh last_used at most this often, so reads rarely write.
+TOUCH_INTERVAL_SEC = 3600
+TRIM_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_cache (
+    content_hash TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    version TEXT NOT NULL,
+    context TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    last_used REAL NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (content_hash, extractor, version, context)
+)
+"""
+# Caches created before eviction get the columns; their rows count as used now, and their
+# size is filled in on the next trim.
+_MIGRATIONS = (
+    ("last_used", "ALTER TABLE parse_cache ADD COLUMN last_used REAL NOT NULL DEFAULT 0"),
+    ("size", "ALTER TABLE parse_cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0"),
+)
+_WHERE_KEY = "content_hash = ? AND extractor = ? AND version = ? AND context = ?"
+
+
+def content_hash(content) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+class ParseCache:
+    """SQLite-backed parse result cache, safe to share between threads."""
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_PATH,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_sec: float = DEFAULT_MAX_AGE_SEC,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_sec = max_age_sec
+        self._local = threading.local()
+        self._purged = set()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(parse_cache)")}
+            for column, statement in _MIGRATIONS:
+                if column not in columns:
+                    with conn:
+                        conn.execute(statement)
+                        if column == "last_used":
+                            conn.execute("UPDATE parse_cache SET last_used = ?", (time.time(),))
+            conn.execute("CREATE INDEX IF NOT EXISTS parse_cache_last_used ON parse_cache (last_used)")
+            self._local.conn = conn
+        return conn
+
+    def _purge_stale(self, extractor: str, version: str):
+        with self._lock:
+            if extractor in self._purged:
+                return
+            self._purged.add(extractor)
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM parse_cache WHERE extractor = ? AND version != ?", (extractor, version))
+
+    def get(self, digest: str, extractor: str, version: str, context: str = "") -> Optional[Any]:
+        key = (digest, extractor, version, context)
+        conn = self._conn()
+        row = conn.execute("SELECT payload, last_used FROM parse_cache WHERE " + _WHERE_KEY, key).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] > TOUCH_INTERVAL_SEC:
+            with conn:
+                conn.execute("UPDATE parse_cache SET last_used = ? WHERE " + _WHERE_KEY, (now, *key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, digest: str, extractor: str, version: str, value: Any, context: str = ""):
+        payload = zlib.compress(json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO parse_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (digest, extractor, version, context, payload, time.time(), len(payload)),
+            )
+        with self._lock:
+            self._puts += 1
+            trim = self._puts % TRIM_EVERY == 1
+        if trim:
+            self.trim()
+
+    def trim(self) -> int:
+        """Drop expired entries, then the least recently used beyond the row and byte caps. Returns rows removed."""
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE parse_cache SET size = length(payload) WHERE size = 0")
+            sized = conn.total_changes
+            conn.execute("DELETE FROM parse_cache WHERE last_used < ?", (time.time() - self.max_age_sec,))
+            conn.execute(
+                "DELETE FROM parse_cache WHERE rowid IN "
+                "(SELECT rowid FROM parse_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.execute(
+                "DELETE FROM parse_cache WHERE rowid IN (SELECT rowid FROM "
+                "(SELECT rowid, SUM(size) OVER (ORDER BY last_used DESC, rowid) AS total FROM parse_cache) "
+                "WHERE total > ?)",
+                (self.max_bytes,),
+            )
+            return conn.total_changes - sized
+
+    def get_or_compute(self, content, extractor: str, version, compute: Callable[[], Any], context: str = "",
+                       digest: Optional[str] = None) -> Any:
+        """
+        Return the cached result for content, or run compute() and store its (JSON-able) result.
+        Pass digest (the SHA-256 of content, e.g. computed while streaming a file to disk) to
+        skip hashing; content is then not used.
+        """
+        version = str(version)
+        self._purge_stale(extractor, version)
+        digest = digest or content_hash(content)
+        cached = self.get(digest, extractor, version, context)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        value = compute()
+        self.put(digest, extractor, version, value, context)
+        return value
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> Optional[ParseCache]:
+    """Process-wide cache from COGNICARE_PARSE_CACHE, or None when disabled."""
+    global _default
+    setting = os.environ.get("COGNICARE_PARSE_CACHE", "")
+    if setting.lower() in ("off", "0", "false"):
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = ParseCache(Path(setting) if setting else DEFAULT_PATH)
+        return _default
+
+
+def cached_parse(content, extractor: str, version, compute: Callable[[], Any], context: str = "",
+                 digest: Optional[str] = None) -> Any:
+    """get_or_compute on the default cache; just compute() when caching is off."""
+    cache = default_cache()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(content, extractor, version, compute, context, digest)
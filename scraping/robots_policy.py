@@ -0,0 +1,266 @@
+"""
+Compiled robots.txt policies, fetched once per host.
+
+RobotsPolicy.parse() groups the rules by user agent (RFC 9309) and compiles each group into a
+prefix trie: literal rules end at a trie node, rules with "*" hang their remainder (a regex) off
+the node of their literal prefix, and "$" anchors a rule to the end of the path. A lookup walks
+the path down the trie once, so only rules whose literal prefix matches are ever looked at, and
+the longest matching rule decides (Allow on a tie). urllib.robotparser instead scans every rule
+of every entry per URL, takes the first match and treats "*" / "$" literally.
+
+RobotsCache keeps one compiled policy per origin for ttl_sec (RFC 9309 allows 24 hours), and
+concurrent lookups for one origin share a single robots.txt fetch. As in RFC 9309 section
+2.3.1, a missing robots.txt (4xx) allows everything, while a server error (5xx) or an
+unreachable host disallows the whole host until it is asked again after error_ttl_sec; such
+policies have error=True, so callers can retry their URLs instead of dropping them.
+bench_robots.py compares URLs/sec with RobotFileParser.
+
+Usage:
+  cache = RobotsCache(lambda robots_url: (status, text))
+  cache.can_fetch("https://example.org/formations/12", "CogniCare-Bot/1.0")
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+DEFAULT_TTL_SEC = 24 * 3600
+# robots.txt answered 5xx or unreachable: crawl nothing on that host, and ask again sooner.
+ERROR_TTL_SEC = 5 * 60
+DEFAULT_MAX_HOSTS = 4096
+
+# Characters left as-is when normalizing paths and patterns (percent-encoding is re-applied).
+_SAFE = "/?=&;:@!$'()*+,~"
+_NEEDS_NORMALIZING = re.compile(r"[^A-Za-z0-9\-._~/?=&;:@!$'()*+,]")
+
+# Trie node: [children, prefix rule, end-anchored rule, [(rule, remainder regex)]];
+# a rule is (pattern length, allow), so max() prefers the longest, then Allow.
+_CHILDREN, _PREFIX, _EXACT, _WILDCARDS = range(4)
+
+
+def normalize_path(path: str) -> str:
+    """Path (and query) with percent-encoding normalized, as both rules and URLs are compared."""
+    if _NEEDS_NORMALIZING.search(path):
+        return quote(unquote(path), safe=_SAFE)
+    return path
+
+
+def request_path(url: str) -> str:
+    """Normalized path + query of url ("/" when empty)."""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path = "{}?{}".format(path, parts.query)
+    return normalize_path(path)
+
+
+def agent_token(user_agent: str) -> str:
+    """Product token of a User-Agent ("CogniCare-Bot/1.0 (...)" -> "cognicare-bot")."""
+    return user_agent.split("/", 1)[0].strip().lower()
+
+
+def _new_node() -> list:
+    return [{}, None, None, []]
+
+
+class RuleTrie:
+    """The Allow / Disallow rules of one user-agent group, compiled for longest-match lookups."""
+
+    def __init__(self, rules: List[Tuple[bool, str]]):
+        self.root = _new_node()
+        self.size = 0
+        for allow, pattern in rules:
+            self.add(allow, pattern)
+
+    def add(self, allow: bool, pattern: str):
+        pattern = normalize_path(pattern)
+        if not pattern:
+            return  # "Disallow:" with no path allows everything
+        rule = (len(pattern), allow)
+        anchored = pattern.endswith("$")
+        body = pattern[:-1] if anchored else pattern
+        stripped = body.rstrip("*")
+        if stripped != body:
+            # "/a*" and "/a*$" both mean "starts with /a".
+            body, anchored = stripped, False
+        star = body.find("*")
+        literal = body if star < 0 else body[:star]
+        node = self._descend(literal)
+        if star >= 0:
+            remainder = ".*".join(re.escape(part) for part in body[star:].split("*"))
+            regex = re.compile(remainder + (r"\Z" if anchored else ""), re.DOTALL)
+            # A repeated pattern keeps only its strongest rule.
+            wildcards = {entry[1].pattern: entry for entry in node[_WILDCARDS]}
+            previous = wildcards.get(regex.pattern)
+            wildcards[regex.pattern] = (max(previous[0], rule), regex) if previous else (rule, regex)
+            node[_WILDCARDS] = sorted(wildcards.values(), key=lambda entry: entry[0], reverse=True)
+        elif anchored:
+            node[_EXACT] = max(node[_EXACT] or rule, rule)
+        else:
+            node[_PREFIX] = max(node[_PREFIX] or rule, rule)
+        self.size += 1
+
+    def _descend(self, literal: str) -> list:
+        node = self.root
+        for char in literal:
+            child = node[_CHILDREN].get(char)
+            if child is None:
+                child = node[_CHILDREN][char] = _new_node()
+            node = child
+        return node
+
+    def allowed(self, path: str) -> bool:
+        """Whether the longest rule matching path (normalized) allows it; True when none matches."""
+        best = None
+        node = self.root
+        end = len(path)
+        i = 0
+        while True:
+            children, prefix, exact, wildcards = node
+            if prefix is not None and (best is None or prefix > best):
+                best = prefix
+            if exact is not None and i == end and (best is None or exact > best):
+                best = exact
+            for rule, regex in wildcards:
+                if best is not None and rule <= best:
+                    break
+                if regex.match(path, i):
+                    best = rule
+                    break
+            if i == end:
+                break
+            node = children.get(path[i])
+            if node is None:
+                break
+            i += 1
+        return best is None or best[1]
+
+
+class RobotsPolicy:
+    """One host's robots.txt, compiled per user-agent group."""
+
+    def __init__(
+        self,
+        groups: Optional[Dict[str, RuleTrie]] = None,
+        allow_all: bool = False,
+        disallow_all: bool = False,
+        error: bool = False,
+    ):
+        self.groups = groups or {}
+        self.allow_all = allow_all
+        self.disallow_all = disallow_all
+        # Disallowed only because robots.txt could not be read (5xx, unreachable): retry later.
+        self.error = error
+        self._by_agent = {}
+
+    @classmethod
+    def parse(cls, text: str) -> "RobotsPolicy":
+        rules: Dict[str, List[Tuple[bool, str]]] = {}
+        agents: List[str] = []
+        in_rules = False
+        for raw in text.lstrip("\ufeff").splitlines():
+            line = raw.split("#", 1)[0].strip()
+            if ":" not in line:
+                continue
+            key, value = (part.strip() for part in line.split(":", 1))
+            key = key.lower()
+            if key == "user-agent":
+                if in_rules:
+                    # A user-agent line after rules starts a new group.
+                    agents, in_rules = [], False
+                token = agent_token(value) or "*"
+                agents.append(token)
+                rules.setdefault(token, [])
+            elif key in ("allow", "disallow"):
+                in_rules = True
+                for token in agents:
+                    rules[token].append((key == "allow", value))
+            elif key == "crawl-delay":
+                in_rules = True
+        return cls({token: RuleTrie(group) for token, group in rules.items()})
+
+    @classmethod
+    def from_response(cls, status: int, text: str) -> "RobotsPolicy":
+        """Policy for a robots.txt fetch: 401/403 and 5xx forbid the host, other 4xx (404, 410) allow it."""
+        if status >= 500:
+            return cls(disallow_all=True, error=True)
+        if status in (401, 403):
+            return cls(disallow_all=True)
+        if status >= 400:
+            return cls(allow_all=True)
+        return cls.parse(text)
+
+    def rules_for(self, user_agent: str) -> Optional[RuleTrie]:
+        """The group matching the agent's product token, else the "*" group."""
+        trie = self._by_agent.get(user_agent)
+        if trie is None and user_agent not in self._by_agent:
+            trie = self.groups.get(agent_token(user_agent)) or self.groups.get("*")
+            self._by_agent[user_agent] = trie
+        return trie
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        if self.disallow_all:
+            return False
+        if self.allow_all:
+            return True
+        trie = self.rules_for(user_agent)
+        if trie is None:
+            return True
+        path = request_path(url)
+        return path == "/robots.txt" or trie.allowed(path)
+
+
+class RobotsCache:
+    """Compiled RobotsPolicy per origin, fetched once per ttl_sec; thread-safe."""
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Tuple[int, str]],
+        ttl_sec: float = DEFAULT_TTL_SEC,
+        error_ttl_sec: float = ERROR_TTL_SEC,
+        max_hosts: int = DEFAULT_MAX_HOSTS,
+    ):
+        """fetch(robots_url) returns (status, text) and raises when the host is unreachable."""
+        self.fetch = fetch
+        self.ttl_sec = ttl_sec
+        self.error_ttl_sec = error_ttl_sec
+        self.max_hosts = max_hosts
+        self._lock = threading.Lock()
+        self._origin_locks = {}
+        self._policies = OrderedDict()  # origin -> (expires_at, policy)
+        self.fetches = 0
+
+    def policy(self, url: str) -> RobotsPolicy:
+        """Policy of url's origin (scheme://host[:port])."""
+        parts = urlsplit(url)
+        origin = "{}://{}".format(parts.scheme, parts.netloc.lower())
+        entry = self._policies.get(origin)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        with self._lock:
+            origin_lock = self._origin_locks.setdefault(origin, threading.Lock())
+        with origin_lock:
+            # Another thread may have fetched it while we waited.
+            entry = self._policies.get(origin)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            try:
+                status, text = self.fetch(origin + "/robots.txt")
+                policy = RobotsPolicy.from_response(status, text)
+                ttl = self.error_ttl_sec if policy.error else self.ttl_sec
+            except Exception:
+                policy, ttl = RobotsPolicy(disallow_all=True, error=True), self.error_ttl_sec
+            with self._lock:
+                self.fetches += 1
+                self._policies[origin] = (time.monotonic() + ttl, policy)
+                self._policies.move_to_end(origin)
+                while len(self._policies) > self.max_hosts:
+                    evicted, _ = self._policies.popitem(last=False)
+                    self._origin_locks.pop(evicted, None)
+        return policy
+
+    def can_fetch(self, url: str, user_agent: str) -> bool:
+        return self.policy(url).can_fetch(user_agent, url)
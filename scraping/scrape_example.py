@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Example scraper scaffold for Tunisian training courses.
-Outputs JSON compatible with CogniCare backend POST /api/v1/courses (admin).
+Outputs JSON compatible with CogniCare backend POST /api/v1/courses (admin);
+upload it with upload_courses.py.
 
 Usage:
   pip install -r requirements.txt
@@ -10,22 +11,14 @@ Usage:
 Respect robots.txt and rate limits when targeting real sites.
 """
 
+import argparse
 import json
 import re
 import sys
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
-
-try:
-    import requests
-    from bs4 import BeautifulSoup
-except ImportError:
-    print("Install dependencies: pip install -r requirements.txt")
-    sys.exit(1)
 
 OUTPUT_DIR = Path(__file__).resolve().parent / "output"
-OUTPUT_DIR.mkdir(exist_ok=True)
 
 
 def slugify(text: str) -> str:
@@ -63,10 +56,12 @@ def scrape_example_site() -> list[dict]:
 
 
 def main():
+    argparse.ArgumentParser(description="Example scraper (writes a placeholder course)").parse_args()
     courses = scrape_example_site()
     # Optional: filter by date, dedupe by slug, etc.
 
     out = {"courses": courses, "scrapedAt": datetime.utcnow().isoformat() + "Z"}
+    OUTPUT_DIR.mkdir(exist_ok=True)
     filename = OUTPUT_DIR / f"courses_{datetime.utcnow().strftime('%Y%m%d_%H%M')}.json"
     with open(filename, "w", encoding="utf-8") as f:
         json.dump(out, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,268 @@
+"""
+Declarative extraction rules for course listing pages.
+
+Each source is described by a rules file in rules/ (JSON, or YAML when PyYAML is
+installed) instead of hand-written BeautifulSoup loops. A rules file lists one or
+more strategies; the first strategy that yields courses wins, the others are
+fallbacks. Selectors are compiled once per source and cached, and parse results are
+cached by page content (see parse_cache.py).
+
+Top-level keys: source, slugPrefix, course (field defaults), baseUrl and seedPaths
+(entry pages for crawls), strategies, follow (CSS selectors of same-host links a crawl
+enqueues, by default pagination links) and followCourseLinks (also enqueue the course
+links, for sources whose detail pages the strategies can parse).
+
+Strategy keys:
+  container    optional CSS selector for the blocks holding the items
+  item         CSS selector for one course (direct child of container, if any)
+  title        selectors tried in order; the first non-empty text wins
+  link         selectors tried in order; the first element with an href wins
+  description  selectors tried in order; the first non-empty text wins
+
+Inside title/link/description, "." is the item itself and "next:<css>" is the
+first element matching <css> after the item in document order. In description,
+"title+" is the element immediately following the matched title.
+
+BeautifulSoup, soupsieve and lxml are only imported when a page is actually parsed, so
+loading rules (e.g. for crawl seeds) or serving cached results does not pay for them.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+from urllib.parse import urldefrag, urljoin, urlparse
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Tag
+
+from parse_cache import cached_parse
+
+RULES_DIR = Path(__file__).resolve().parent / "rules"
+
+# Bump when SiteRules.parse / SiteRules.links output changes for the same rules and HTML.
+EXTRACTOR_VERSION = 1
+# Pagination links followed by crawls when a rules file has no "follow" key.
+DEFAULT_FOLLOW = ['a[rel~="next"]', "a.next", ".pager a[href]", ".pagination a[href]", "a.page-numbers"]
+
+# Field order matches the CogniCare POST /api/v1/courses body.
+COURSE_DEFAULTS = {
+    "title": None,
+    "description": None,
+    "slug": None,
+    "isQualificationCourse": False,
+    "startDate": None,
+    "endDate": None,
+    "courseType": "basic",
+    "price": "À préciser",
+    "location": None,
+    "enrollmentLink": None,
+    "certification": None,
+    "targetAudience": "volunteers, parents",
+    "prerequisites": "Aucun",
+    "sourceUrl": None,
+}
+
+
+def slugify(text: str) -> str:
+    """Generate a URL-safe slug from title."""
+    text = text.lower().strip()
+    text = re.sub(r"[^\w\s-]", "", text)
+    text = re.sub(r"[-\s]+", "-", text)
+    return text[:80] or "course"
+
+
+class Probe:
+    """One compiled title/link/description selector, relative to an item."""
+
+    def __init__(self, spec: str):
+        import soupsieve as sv
+
+        self.self_ref = spec == "."
+        self.after_title = spec == "title+"
+        self.following = spec.startswith("next:")
+        css = spec[len("next:"):] if self.following else spec
+        self.pattern = None if self.self_ref or self.after_title else sv.compile(css)
+
+    def find(self, item: Tag, title_el: Optional[Tag] = None) -> Optional[Tag]:
+        from bs4 import Tag
+
+        if self.self_ref:
+            return item
+        if self.after_title:
+            sibling = title_el.next_sibling if title_el is not None else None
+            return sibling if isinstance(sibling, Tag) else None
+        if self.following:
+            for el in item.next_elements:
+                if isinstance(el, Tag) and self.pattern.match(el):
+                    return el
+            return None
+        return self.pattern.select_one(item)
+
+
+class Strategy:
+    """A compiled extraction strategy (see module docstring for the keys)."""
+
+    def __init__(self, spec: dict):
+        import soupsieve as sv
+
+        item = spec["item"]
+        if spec.get("container"):
+            item = ":is({}) > :is({})".format(spec["container"], item)
+        self.items = sv.compile(item)
+        self.title = [Probe(s) for s in _as_list(spec.get("title", ["."]))]
+        self.link = [Probe(s) for s in _as_list(spec.get("link", []))]
+        self.description = [Probe(s) for s in _as_list(spec.get("description", []))]
+        self.min_title_length = spec.get("minTitleLength", 3)
+        self.max_title_length = spec.get("maxTitleLength")
+        self.description_template = spec.get("descriptionTemplate", "{title}")
+
+    def extract(self, soup: BeautifulSoup, source_base: str):
+        """Yield (title, link, description) for every item, in document order."""
+        for item in self.items.select(soup):
+            title_el, title = _first_text(self.title, item)
+            if not title or len(title) < self.min_title_length:
+                continue
+            if self.max_title_length and len(title) > self.max_title_length:
+                continue
+            link = None
+            for probe in self.link:
+                el = probe.find(item)
+                if el is not None and el.get("href"):
+                    link = urljoin(source_base, el["href"])
+                    break
+            description = (_first_text(self.description, item, title_el)[1] or "")[:500]
+            yield title, link, description or self.description_template.format(title=title)
+
+
+class SiteRules:
+    """Compiled rules for one source."""
+
+    def __init__(self, spec: dict):
+        self.source = spec["source"]
+        self.slug_prefix = spec.get("slugPrefix", "")
+        self.base_url = spec.get("baseUrl")
+        self.seed_paths = spec.get("seedPaths", ["/"])
+        self.course = {**COURSE_DEFAULTS, **spec.get("course", {})}
+        self.follow_course_links = spec.get("followCourseLinks", False)
+        self._follow_spec = ", ".join(_as_list(spec.get("follow", DEFAULT_FOLLOW)))
+        self._follow = None
+        self._strategy_specs = spec["strategies"]
+        self._strategies = None
+        # Editing a rules file invalidates that source's cached results only.
+        spec_hash = hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.version = "{}-{}".format(EXTRACTOR_VERSION, spec_hash)
+
+    @property
+    def strategies(self) -> list[Strategy]:
+        """Strategies compiled on first use."""
+        if self._strategies is None:
+            self._strategies = [Strategy(s) for s in self._strategy_specs]
+        return self._strategies
+
+    def parse(self, html: bytes | str, source_base: str) -> list[dict]:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, "lxml")
+        for strategy in self.strategies:
+            courses = []
+            seen = set()
+            for title, link, description in strategy.extract(soup, source_base):
+                title = title[:200]
+                slug = self.slug_prefix + slugify(title)
+                if slug in seen:
+                    continue
+                seen.add(slug)
+                courses.append({
+                    **self.course,
+                    "title": title,
+                    "description": description,
+                    "slug": slug,
+                    "enrollmentLink": link,
+                    "sourceUrl": link or source_base,
+                })
+            if courses:
+                return courses
+        return []
+
+    def links(self, html: bytes | str, source_base: str) -> list[str]:
+        """Absolute same-host URLs matched by the follow selectors, in document order."""
+        import soupsieve as sv
+        from bs4 import BeautifulSoup
+
+        if not self._follow_spec:
+            return []
+        if self._follow is None:
+            self._follow = sv.compile(self._follow_spec)
+        host = urlparse(source_base).netloc
+        found = []
+        for el in self._follow.select(BeautifulSoup(html, "lxml")):
+            url = urldefrag(urljoin(source_base, el.get("href") or ""))[0]
+            if url.startswith(("http://", "https://")) and urlparse(url).netloc == host:
+                found.append(url)
+        return list(dict.fromkeys(found))
+
+
+@lru_cache(maxsize=None)
+def load_rules(source: str) -> SiteRules:
+    """Load rules/<source>.json (or .yaml/.yml); selectors are compiled on first parse."""
+    for ext in (".json", ".yaml", ".yml"):
+        path = RULES_DIR / (source + ext)
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            if ext == ".json":
+                return SiteRules(json.load(f))
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError("Install PyYAML to use {}".format(path.name)) from None
+            return SiteRules(yaml.safe_load(f))
+    raise FileNotFoundError("No extraction rules for source {!r} in {}".format(source, RULES_DIR))
+
+
+def available_sources() -> list[str]:
+    """Names of the sources that have a rules file."""
+    return sorted({p.stem for p in RULES_DIR.iterdir() if p.suffix in (".json", ".yaml", ".yml")})
+
+
+def parse_courses(html: bytes | str, source_base: str, source: str) -> list[dict]:
+    """
+    Parse course dicts for CogniCare API from a listing page using the source's rules.
+    Pass the raw response bytes: they key the parse cache, and are only decoded on a miss.
+    """
+    rules = load_rules(source)
+    return cached_parse(
+        html, "site_rules:" + source, rules.version, lambda: rules.parse(html, source_base), context=source_base,
+    )
+
+
+def discover_links(html: bytes | str, source_base: str, source: str) -> list[str]:
+    """Same-host URLs a crawl should enqueue from a page: follow links, plus course links if enabled."""
+    rules = load_rules(source)
+    links = cached_parse(
+        html, "site_rules-links:" + source, rules.version, lambda: rules.links(html, source_base), context=source_base,
+    )
+    if rules.follow_course_links:
+        host = urlparse(source_base).netloc
+        course_links = (c["enrollmentLink"] for c in parse_courses(html, source_base, source) if c.get("enrollmentLink"))
+        links = list(dict.fromkeys(links + [u for u in course_links if urlparse(u).netloc == host]))
+    return links
+
+
+def _as_list(value) -> list:
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _first_text(probes: list, item: Tag, title_el: Optional[Tag] = None) -> tuple:
+    """Return (element, text) for the first probe yielding non-empty text."""
+    for probe in probes:
+        el = probe.find(item, title_el)
+        if el is not None:
+            text = el.get_text(strip=True)
+            if text:
+                return el, text
+    return None, None
@@ -0,0 +1,465 @@
+"""
+Synthetic stand-in sites for crawl load tests.
+
+Serves generated pages locally that mimic the layouts our scrapers target
+(autisme-tunisie.org, cnfct.nat.tn, femmes.gov.tn, WHO and NAS training pages),
+with configurable page count, latency, error/throttle rates and robots.txt rules.
+Pages are generated deterministically from their index, so 100k-page sites cost
+no memory. Also provides stand-ins for the backend POST /api/v1/courses and
+/api/v1/courses/bulk routes and for an oEmbed provider (GET /oembed?url=...) used for
+video metadata lookups.
+
+Usage (standalone, for manual runs):
+  python standin_sites.py --profile cnfct --pages 1000 --latency-ms 50
+  python standin_sites.py --courses-api --error-rate 0.05
+  python standin_sites.py --oembed --latency-ms 100
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+PROFILES = ("autisme-tunisie", "cnfct", "femmes-gov-tn", "who", "nas")
+
+# Paths the Tunisian scrapers try first; all of them serve listing page 0.
+ENTRY_PATHS = {"/", "/fr/", "/formations", "/fr/formations", "/activites", "/nos-activites", "/stages"}
+
+ITEMS_PER_PAGE = 10
+
+_WORDS = (
+    "autisme accompagnement enfant parents formation atelier communication sensoriel routine "
+    "inclusion scolaire TEACCH PECS comportement aidants autonomie jeu langage evaluation "
+    "module pratique initiation approfondissement stage certification"
+).split()
+_EN_WORDS = (
+    "autism caregiver training support communication behaviour routine sensory school "
+    "parents skills understanding children family wellbeing guidance learning module"
+).split()
+
+
+@dataclass
+class SiteConfig:
+    """Behaviour of one stand-in site."""
+
+    profile: str = "autisme-tunisie"
+    pages: int = 100
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after_sec: int = 1
+    disallow: list = field(default_factory=list)
+    seed: int = 0
+
+
+class SiteStats:
+    """Thread-safe counters of what the stand-in served."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "ok": 0, "robots": 0, "errors": 0, "throttled": 0, "not_found": 0, "bad_request": 0}
+
+    def incr(self, key: str):
+        with self._lock:
+            self.counts["requests"] += 1
+            self.counts[key] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def _words(rng: random.Random, vocab: tuple, n: int) -> str:
+    return " ".join(rng.choice(vocab) for _ in range(n))
+
+
+def _title(rng: random.Random, vocab: tuple, index: int) -> str:
+    return "{} {} #{}".format(_words(rng, vocab, 3).capitalize(), _words(rng, vocab, 2), index)
+
+
+def _page_links(page: int, pages: int) -> str:
+    links = []
+    if page + 1 < pages:
+        links.append('<a class="next" href="/p/{}">Suivant</a>'.format(page + 1))
+    if page > 0:
+        links.append('<a class="prev" href="/p/{}">Précédent</a>'.format(page - 1))
+    return "<nav class=\"pager\">{}</nav>".format(" ".join(links))
+
+
+def render_page(config: SiteConfig, page: int) -> str:
+    """Generate the HTML of page number `page` for the configured profile."""
+    rng = random.Random("{}:{}:{}".format(config.seed, config.profile, page))
+    profile = config.profile
+    first = page * ITEMS_PER_PAGE
+    if profile in ("who", "nas"):
+        body = _render_article(rng, page)
+    else:
+        items = []
+        for i in range(first, first + ITEMS_PER_PAGE):
+            title = _title(rng, _WORDS, i)
+            desc = _words(rng, _WORDS, 25)
+            href = "/formations/{}".format(i)
+            if profile == "autisme-tunisie":
+                items.append('<article class="post"><h3>{}</h3><p>{}</p><a href="{}">Lire la suite</a></article>'.format(title, desc, href))
+            elif profile == "cnfct":
+                items.append('<li><a href="{}">{}</a><p>{}</p></li>'.format(href, title, desc))
+            else:
+                items.append('<article><h2>{}</h2><p>{}</p><a href="{}">Détails</a></article>'.format(title, desc, href))
+        if profile == "autisme-tunisie":
+            body = '<section class="formations-list">{}</section>'.format("".join(items))
+        elif profile == "cnfct":
+            body = '<ul class="list-formations">{}</ul>'.format("".join(items))
+        else:
+            body = '<div class="renforcement-capacites">{}</div>'.format("".join(items))
+    return (
+        "<!DOCTYPE html><html><head><title>{} – page {}</title>"
+        '<meta name="description" content="{}"></head><body>'
+        '<header><ul class="menu"><li><a href="/">Accueil</a></li><li><a href="/formations">Formations</a></li></ul></header>'
+        "<main>{}</main>{}</body></html>"
+    ).format(profile, page, _words(rng, _WORDS, 12), body, _page_links(page, config.pages))
+
+
+def _render_article(rng: random.Random, page: int) -> str:
+    parts = ["<h1>{}</h1>".format(_title(rng, _EN_WORDS, page))]
+    for _ in range(rng.randint(3, 6)):
+        parts.append("<h2>{}</h2>".format(_words(rng, _EN_WORDS, 4).capitalize()))
+        for _ in range(rng.randint(1, 3)):
+            parts.append("<p>{}.</p>".format(_words(rng, _EN_WORDS, rng.randint(20, 60)).capitalize()))
+        if rng.random() < 0.5:
+            parts.append("<ul>{}</ul>".format("".join("<li>{}</li>".format(_words(rng, _EN_WORDS, 5)) for _ in range(4))))
+    if rng.random() < 0.3:
+        parts.append('<p>Watch the <a href="https://www.youtube.com/watch?v=stand{}">training video</a> for caregivers.</p>'.format(page))
+    parts.append("<dl><dt>Autism</dt><dd>{}</dd></dl>".format(_words(rng, _EN_WORDS, 15)))
+    return "<article>{}</article>".format("".join(parts))
+
+
+def render_robots(config: SiteConfig) -> str:
+    lines = ["User-agent: *"]
+    lines.extend("Disallow: {}".format(path) for path in config.disallow)
+    if not config.disallow:
+        lines.append("Disallow:")
+    return "\n".join(lines) + "\n"
+
+
+def page_index(path: str) -> Optional[int]:
+    """Map a request path to a page index, or None for unknown paths."""
+    if path in ENTRY_PATHS:
+        return 0
+    for prefix in ("/p/", "/formations/"):
+        if path.startswith(prefix):
+            try:
+                return int(path[len(prefix):].strip("/"))
+            except ValueError:
+                return None
+    return None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StandinServer"
+
+    def do_GET(self):
+        site = self.server.site
+        parsed = urlparse(self.path)
+        if parsed.path == "/robots.txt":
+            self.server.stats.incr("robots")
+            return self._send(200, render_robots(site), "text/plain")
+        delay = site.latency_ms + self.server.rng_uniform(0, site.latency_jitter_ms)
+        if delay:
+            time.sleep(delay / 1000.0)
+        roll = self.server.rng_uniform(0, 1)
+        if roll < site.throttle_rate:
+            self.server.stats.incr("throttled")
+            return self._send(429, "Too Many Requests", "text/plain", {"Retry-After": str(site.retry_after_sec)})
+        if roll < site.throttle_rate + site.error_rate:
+            self.server.stats.incr("errors")
+            return self._send(503, "Service Unavailable", "text/plain", {"Retry-After": str(site.retry_after_sec)})
+        if parsed.path.startswith("/r/"):
+            # Redirecting alias of a page, for canonical-URL resolution.
+            self.server.stats.incr("ok")
+            return self._send(301, "", "text/plain", {"Location": "/p/" + parsed.path[len("/r/"):]})
+        index = page_index(parsed.path)
+        page = parse_qs(parsed.query, keep_blank_values=True).get("page")
+        if page is not None:
+            try:
+                index = int(page[0])
+            except ValueError:
+                self.server.stats.incr("bad_request")
+                return self._send(400, "Bad Request: page must be an integer", "text/plain")
+        if index is None or not 0 <= index < site.pages:
+            self.server.stats.incr("not_found")
+            return self._send(404, "Not Found", "text/plain")
+        self.server.stats.incr("ok")
+        self._send(200, render_page(site, index), "text/html; charset=utf-8")
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def _send(self, status: int, body: str, content_type: str, headers: Optional[dict] = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinServer(ThreadingHTTPServer):
+    """A local HTTP server serving one synthetic site on 127.0.0.1."""
+
+    daemon_threads = True
+
+    def __init__(self, site: SiteConfig, port: int = 0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.site = site
+        self.stats = SiteStats()
+        self._rng = random.Random(site.seed)
+        self._rng_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+    def page_url(self, index: int) -> str:
+        return "{}/p/{}".format(self.base_url, index)
+
+    def rng_uniform(self, low: float, high: float) -> float:
+        if high <= low:
+            return low
+        with self._rng_lock:
+            return self._rng.uniform(low, high)
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _CoursesApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StandinCoursesApi"
+
+    def do_POST(self):
+        api = self.server
+        path = urlparse(self.path).path
+        if path not in ("/api/v1/courses", "/api/v1/courses/bulk"):
+            return self._send(404, {"message": "Not Found"})
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            return self._send(401, {"message": "Unauthorized"})
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        delay = api.site.latency_ms + api.rng_uniform(0, api.site.latency_jitter_ms)
+        if delay:
+            time.sleep(delay / 1000.0)
+        roll = api.rng_uniform(0, 1)
+        if roll < api.site.throttle_rate:
+            api.stats.incr("throttled")
+            return self._send(429, {"message": "Too Many Requests"}, {"Retry-After": str(api.site.retry_after_sec)})
+        if roll < api.site.throttle_rate + api.site.error_rate:
+            api.stats.incr("errors")
+            return self._send(503, {"message": "Service Unavailable"})
+        courses = body.get("courses") if path.endswith("/bulk") else [body]
+        if not isinstance(courses, list) or any(not c.get("slug") or not c.get("title") for c in courses):
+            return self._send(400, {"message": "title and slug are required"})
+        api.stats.incr("ok")
+        with api.lock:
+            if path.endswith("/bulk"):
+                # Same semantics as CoursesService.upsertMany: insert new slugs, update the others
+                # (isQualificationCourse is only set on insert).
+                counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+                for course in courses:
+                    existing = api.courses.get(course["slug"])
+                    if existing is None:
+                        api.courses[course["slug"]] = dict(course)
+                        counts["inserted"] += 1
+                        continue
+                    fields = {k: v for k, v in course.items() if k != "isQualificationCourse"}
+                    changed = any(existing.get(k) != v for k, v in fields.items())
+                    existing.update(fields)
+                    counts["updated" if changed else "unchanged"] += 1
+                payload = counts
+            else:
+                # CoursesService.create leaves existing slugs untouched and answers with the whole catalog.
+                api.courses.setdefault(body["slug"], body)
+                payload = list(api.courses.values())
+        self._send(201, payload)
+
+    def do_GET(self):
+        with self.server.lock:
+            courses = list(self.server.courses.values())
+        self._send(200, courses)
+
+    def _send(self, status: int, payload, headers: Optional[dict] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinCoursesApi(StandinServer):
+    """Stand-in for the backend courses API: POST /api/v1/courses[/bulk], keyed by slug."""
+
+    def __init__(self, site: Optional[SiteConfig] = None, port: int = 0):
+        super().__init__(site or SiteConfig(), port)
+        self.RequestHandlerClass = _CoursesApiHandler
+        self.lock = threading.Lock()
+        self.courses = {}
+
+    @property
+    def api_url(self) -> str:
+        return self.base_url + "/api/v1"
+
+
+class _OEmbedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "StandinOEmbed"
+
+    def do_GET(self):
+        provider = self.server
+        parsed = urlparse(self.path)
+        url = (parse_qs(parsed.query).get("url") or [""])[0]
+        if parsed.path != "/oembed" or not url:
+            return self._send(404, {"error": "not found"})
+        host = urlparse(url).netloc.lower()
+        with provider.lock:
+            provider.inflight[host] = provider.inflight.get(host, 0) + 1
+            provider.max_inflight[host] = max(provider.max_inflight.get(host, 0), provider.inflight[host])
+        try:
+            delay = provider.site.latency_ms + provider.rng_uniform(0, provider.site.latency_jitter_ms)
+            if delay:
+                time.sleep(delay / 1000.0)
+            if "missing" in url or provider.rng_uniform(0, 1) < provider.site.error_rate:
+                provider.stats.incr("not_found")
+                return self._send(404, {"error": "not found"})
+            provider.stats.incr("ok")
+            digest = int(hashlib.sha1(url.encode("utf-8")).hexdigest()[:8], 16)
+            self._send(200, {
+                "type": "video",
+                "version": "1.0",
+                "title": "Video {} about {}".format(digest % 1000, _EN_WORDS[digest % len(_EN_WORDS)]),
+                "provider_name": host.replace("www.", "").split(".")[0].capitalize(),
+                "duration": 60 + digest % 1800,
+                "thumbnail_url": "{}/thumb/{}.jpg".format(provider.base_url, digest),
+                "thumbnail_width": 480,
+                "thumbnail_height": 360,
+            })
+        finally:
+            with provider.lock:
+                provider.inflight[host] -= 1
+
+    def _send(self, status: int, payload, headers: Optional[dict] = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinOEmbed(StandinServer):
+    """Stand-in oEmbed provider; records the peak number of concurrent lookups per video host."""
+
+    def __init__(self, site: Optional[SiteConfig] = None, port: int = 0):
+        super().__init__(site or SiteConfig(), port)
+        self.RequestHandlerClass = _OEmbedHandler
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.max_inflight = {}
+
+    @property
+    def endpoint(self) -> str:
+        return self.base_url + "/oembed"
+
+
+def add_site_arguments(parser: argparse.ArgumentParser):
+    """Register the SiteConfig options on an argparse parser."""
+    parser.add_argument("--pages", type=int, default=100, help="Pages per site (up to 100k)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Base response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random latency (uniform)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of 429 responses")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds on 429/503")
+    parser.add_argument("--disallow", action="append", default=[], help="robots.txt Disallow path (repeatable)")
+    parser.add_argument("--seed", type=int, default=0, help="Content/latency random seed")
+
+
+def site_config_from_args(profile: str, args: argparse.Namespace) -> SiteConfig:
+    return SiteConfig(
+        profile=profile,
+        pages=args.pages,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after_sec=args.retry_after,
+        disallow=args.disallow,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic stand-in site locally")
+    parser.add_argument("--profile", choices=PROFILES, default="autisme-tunisie")
+    parser.add_argument("--courses-api", action="store_true", help="Serve the courses API stand-in instead of a site")
+    parser.add_argument("--oembed", action="store_true", help="Serve the oEmbed provider stand-in instead of a site")
+    parser.add_argument("--port", type=int, default=8765)
+    add_site_arguments(parser)
+    args = parser.parse_args()
+    if args.courses_api:
+        server = StandinCoursesApi(site_config_from_args(args.profile, args), args.port)
+        print("Serving courses API stand-in at {}".format(server.api_url))
+    elif args.oembed:
+        server = StandinOEmbed(site_config_from_args(args.profile, args), args.port)
+        print("Serving oEmbed stand-in at {} (set COGNICARE_OEMBED_ENDPOINT)".format(server.endpoint))
+    else:
+        server = StandinServer(site_config_from_args(args.profile, args), args.port)
+        print("Serving {} ({} pages) at {}".format(args.profile, args.pages, server.base_url))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.stats.snapshot())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
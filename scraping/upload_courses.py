@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Bulk upload of scraped courses to the CogniCare backend (POST /api/v1/courses/bulk, admin).
+
+Streams courses from the scraper output files, skips duplicate slugs, and sends them one
+batch per request, up to --concurrency batches at a time over one pooled session (the
+single-course POST /courses answers every insert with the whole catalog, so uploading
+course by course costs O(n^2)). The backend inserts new slugs and updates the courses it
+already has, so re-sending is safe; failed requests are retried with backoff (honouring
+Retry-After). Every completed round of batches records slug -> content hash in a checkpoint
+file, so an interrupted sync resumes where it stopped and later syncs only send new or
+changed courses. With --validate-links, dead links are pruned (see validate_links.py)
+before each batch is sent.
+
+Usage:
+  export COGNICARE_API_URL=https://your-api/api/v1
+  export COGNICARE_ADMIN_TOKEN=...
+  python upload_courses.py                       # all output/courses_*.json
+  python upload_courses.py output/courses_cnfct_20260301_0900.json --concurrency 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
+
+from validate_links import LinkCache, LinkValidator, validate_courses
+
+if TYPE_CHECKING:
+    import requests
+
+OUTPUT_DIR = Path(__file__).resolve().parent / "output"
+DEFAULT_CHECKPOINT = OUTPUT_DIR / ".upload_checkpoint.json"
+DEFAULT_API_URL = "http://localhost:3000/api/v1"
+
+# Fields accepted by CoursesController.create / upsertMany
+COURSE_FIELDS = (
+    "title", "description", "slug", "isQualificationCourse", "startDate", "endDate",
+    "courseType", "price", "location", "enrollmentLink", "certification",
+    "targetAudience", "prerequisites", "sourceUrl", "sourceUrls",
+)
+
+
+def iter_courses(paths: Iterable[Path]) -> Iterator[dict]:
+    """Yield courses from scraper output files, one file in memory at a time."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        courses = data.get("courses", []) if isinstance(data, dict) else data
+        for course in courses:
+            yield course
+
+
+def course_payload(course: dict) -> dict:
+    return {key: course[key] for key in COURSE_FIELDS if course.get(key) is not None}
+
+
+def content_hash(course: dict) -> str:
+    data = json.dumps(course_payload(course), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+
+def unique_by_slug(courses: Iterable[dict]) -> Iterator[dict]:
+    """Drop courses without a slug or repeated in the input (the first one wins)."""
+    seen = set()
+    for course in courses:
+        slug = course.get("slug")
+        if not slug or slug in seen:
+            continue
+        seen.add(slug)
+        yield course
+
+
+def changed_courses(courses: Iterable[dict], uploaded: dict, hashes: dict, counts: dict) -> Iterator[dict]:
+    """Courses new or changed since the checkpoint; records their hash, counts the rest as skipped."""
+    for course in courses:
+        digest = content_hash(course)
+        if uploaded.get(course["slug"]) == digest:
+            counts["skipped"] += 1
+            continue
+        hashes[course["slug"]] = digest
+        yield course
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_checkpoint(path: Path) -> dict:
+    """{slug: content hash} of uploaded courses (a list from older checkpoints has no hashes)."""
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        uploaded = json.load(f).get("uploaded", {})
+    return uploaded if isinstance(uploaded, dict) else dict.fromkeys(uploaded)
+
+
+def save_checkpoint(path: Path, uploaded: dict):
+    """Write the checkpoint atomically so a crash never leaves it half-written."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"uploaded": dict(sorted(uploaded.items())), "updatedAt": time.time()}, f)
+    os.replace(tmp, path)
+
+
+def make_session(token: str, concurrency: int, retries: int, backoff: float) -> requests.Session:
+    """Pooled session whose adapter retries 429/5xx with exponential backoff."""
+    try:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+    except ImportError:
+        print("Install dependencies: pip install -r requirements.txt")
+        sys.exit(1)
+
+    session = requests.Session()
+    session.headers["Authorization"] = "Bearer {}".format(token)
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        # POST is safe to retry: the backend treats an existing slug as a no-op.
+        allowed_methods=frozenset({"POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def upload_batch(session: requests.Session, api_url: str, batch: list, timeout: float) -> tuple:
+    """POST one batch to /courses/bulk; returns (slugs, error or None)."""
+    slugs = [course["slug"] for course in batch]
+    payload = [course_payload(course) for course in batch]
+    try:
+        r = session.post(api_url.rstrip("/") + "/courses/bulk", json={"courses": payload}, timeout=timeout)
+        r.raise_for_status()
+        return slugs, None
+    except Exception as e:
+        return slugs, str(e)
+
+
+def sync(
+    paths: list,
+    api_url: str,
+    token: str,
+    checkpoint: Path = DEFAULT_CHECKPOINT,
+    batch_size: int = 50,
+    concurrency: int = 8,
+    retries: int = 5,
+    backoff: float = 0.5,
+    timeout: float = 30,
+    validator: Optional[LinkValidator] = None,
+) -> dict:
+    """
+    Upload the new or changed courses in paths; returns counts of uploaded, skipped
+    (unchanged since the checkpoint) and failed courses.
+    """
+    uploaded = load_checkpoint(checkpoint)
+    counts = {"uploaded": 0, "skipped": 0, "failed": 0}
+    hashes = {}
+    failed = {}
+    session = make_session(token, concurrency, retries, backoff)
+    batches = batched(changed_courses(unique_by_slug(iter_courses(paths)), uploaded, hashes, counts), batch_size)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for round_ in batched(batches, concurrency):
+            if validator is not None:
+                for batch in round_:
+                    validate_courses(batch, validator, prune=True)
+            for slugs, error in pool.map(lambda b: upload_batch(session, api_url, b, timeout), round_):
+                for slug in slugs:
+                    if error:
+                        failed[slug] = error
+                    else:
+                        uploaded[slug] = hashes[slug]
+                        counts["uploaded"] += 1
+                        failed.pop(slug, None)
+            save_checkpoint(checkpoint, uploaded)
+    for slug, error in failed.items():
+        print("Upload failed {}: {}".format(slug, error), file=sys.stderr)
+    counts["failed"] = len(failed)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload scraped courses to CogniCare POST /api/v1/courses/bulk")
+    parser.add_argument("files", nargs="*", type=Path, help="Scraper output files (default: output/courses_*.json)")
+    parser.add_argument("--api", default=os.environ.get("COGNICARE_API_URL", DEFAULT_API_URL), help="API base URL")
+    parser.add_argument("--token", default=os.environ.get("COGNICARE_ADMIN_TOKEN"), help="Admin JWT")
+    parser.add_argument("--batch-size", type=int, default=50, help="Courses per request")
+    parser.add_argument("--concurrency", type=int, default=8, help="Batches in flight")
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--reset", action="store_true", help="Ignore the checkpoint and re-send everything")
+    parser.add_argument("--validate-links", action="store_true", help="Prune dead enrollment links before upload")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("an admin token is required (--token or COGNICARE_ADMIN_TOKEN)")
+    files = args.files or sorted(OUTPUT_DIR.glob("courses_*.json"))
+    if args.reset and args.checkpoint.exists():
+        args.checkpoint.unlink()
+
+    started = time.perf_counter()
+    validator = LinkValidator(LinkCache()) if args.validate_links else None
+    counts = sync(files, args.api, args.token, args.checkpoint, args.batch_size, args.concurrency, args.retries,
+                  validator=validator)
+    print("Uploaded {uploaded}, skipped {skipped} (unchanged), failed {failed}".format(**counts),
+          "in {:.1f}s".format(time.perf_counter() - started))
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
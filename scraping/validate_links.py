@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Concurrent liveness check of the outbound links in a course catalog.
+
+Checks every enrollmentLink, sourceUrl and contentSections[].videoUrl with HEAD
+(falling back to GET when HEAD is refused), following redirects to the canonical URL.
+Links are grouped by host into at most per_host lanes each, and the lanes share one thread
+pool, so a slow host never holds more than per_host threads. Results are cached in SQLite
+with a TTL so re-validating a catalog only touches new or expired links.
+
+Each result has a state: "ok", "dead" (4xx such as 404 / 410) or "unknown" (timeouts,
+connection errors, 401 / 403 login and bot walls, 408 / 429 and 5xx). Unknown results are
+never pruned and are cached for minutes only, so a flaky provider is simply checked again.
+
+Flag mode records problems in a "linkIssues" list on each course; --prune clears dead
+links instead and turns video sections whose URL is dead or not a video into text.
+Redirected links are rewritten to their final URL in both modes.
+
+Usage:
+  python validate_links.py output/courses_cnfct_20260301_0900.json --prune
+  python validate_links.py ../scripts/autism_training_scraper/training_courses.json --out checked.json
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+DEFAULT_CACHE = Path(__file__).resolve().parent / "cache" / "link_cache.sqlite3"
+USER_AGENT = "CogniCare-Bot/1.0 (training catalog; +https://cognicare.app)"
+DEFAULT_TTL_SEC = 7 * 24 * 3600
+# Lifetime of "unknown" results (server errors, throttling, network failures).
+TRANSIENT_TTL_SEC = 10 * 60
+TRANSIENT_STATUSES = (408, 425, 429)
+# The link may be fine for a logged-in user or a browser; the bot just cannot tell.
+UNVERIFIABLE_STATUSES = (401, 403)
+
+VIDEO_HOSTS = ("youtube.com", "youtu.be", "youtube-nocookie.com", "vimeo.com", "dailymotion.com", "dai.ly")
+COURSE_LINK_FIELDS = ("enrollmentLink", "sourceUrl")
+
+
+def is_video_url(url: str, content_type: str = "") -> bool:
+    host = urlparse(url).netloc.lower().split(":")[0]
+    if any(host == h or host.endswith("." + h) for h in VIDEO_HOSTS):
+        return True
+    return content_type.startswith("video/")
+
+
+def link_state(result: dict) -> str:
+    """"ok", "dead" or "unknown" (results cached before states existed count as ok / dead)."""
+    return result.get("state") or ("ok" if result["ok"] else "dead")
+
+
+def status_state(status: int) -> str:
+    if status < 400:
+        return "ok"
+    if status in TRANSIENT_STATUSES or status in UNVERIFIABLE_STATUSES or status >= 500:
+        return "unknown"
+    return "dead"
+
+
+class LinkCache:
+    """SQLite cache of link check results with a TTL (a short one for transient results)."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE, ttl_sec: float = DEFAULT_TTL_SEC, transient_ttl_sec: float = TRANSIENT_TTL_SEC):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_sec = ttl_sec
+        self.transient_ttl_sec = transient_ttl_sec
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS links (url TEXT PRIMARY KEY, checked_at REAL NOT NULL, result TEXT NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> Optional[dict]:
+        row = self._conn().execute("SELECT checked_at, result FROM links WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[1])
+        ttl = self.transient_ttl_sec if link_state(result) == "unknown" else self.ttl_sec
+        if time.time() - row[0] > ttl:
+            return None
+        return result
+
+    def put(self, url: str, result: dict):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO links VALUES (?, ?, ?)", (url, time.time(), json.dumps(result)))
+
+
+class LinkValidator:
+    """Checks URLs concurrently with a global and a per-host concurrency limit."""
+
+    def __init__(self, cache: Optional[LinkCache] = None, concurrency: int = 64, per_host: int = 4, timeout: float = 10):
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+        except ImportError:
+            raise RuntimeError("Install dependencies: pip install -r requirements.txt") from None
+        self.cache = cache
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, url: str) -> dict:
+        import requests
+
+        try:
+            r = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+            if r.status_code in (403, 405, 501) or r.status_code >= 500:
+                # Many servers refuse or mishandle HEAD; confirm with a GET without reading the body.
+                r = self.session.get(url, allow_redirects=True, timeout=self.timeout, stream=True)
+                r.close()
+            state = status_state(r.status_code)
+            return {
+                "ok": state == "ok",
+                "state": state,
+                "status": r.status_code,
+                "finalUrl": r.url,
+                "contentType": r.headers.get("Content-Type", "").split(";")[0].strip().lower(),
+            }
+        except requests.RequestException as e:
+            return {"ok": False, "state": "unknown", "status": None, "finalUrl": url, "contentType": "", "error": str(e)[:200]}
+
+    def check(self, url: str) -> dict:
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+        result = self._request(url)
+        if self.cache is not None:
+            self.cache.put(url, result)
+        return result
+
+    def check_many(self, urls: Iterable[str]) -> dict:
+        """Check each distinct http(s) URL once; returns {url: result}."""
+        unique = [u for u in dict.fromkeys(urls) if u and u.startswith(("http://", "https://"))]
+        by_host = defaultdict(list)
+        for url in unique:
+            by_host[urlparse(url).netloc.lower()].append(url)
+        # Up to per_host lanes per host, each checking its URLs one after another, so a pool
+        # thread never waits on another host's limit. Longest lanes start first.
+        lanes = [
+            host_urls[i::self.per_host]
+            for host_urls in by_host.values()
+            for i in range(min(self.per_host, len(host_urls)))
+        ]
+        lanes.sort(key=len, reverse=True)
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for lane_results in pool.map(lambda lane: [(u, self.check(u)) for u in lane], lanes):
+                results.update(lane_results)
+        return {url: results[url] for url in unique}
+
+
+def catalog_courses(data) -> list:
+    """Courses of either output format: {"courses": [...]} or a plain list (training API)."""
+    return data.get("courses", []) if isinstance(data, dict) else data
+
+
+def catalog_links(courses: list) -> list:
+    links = []
+    for course in courses:
+        links.extend(course.get(field) for field in COURSE_LINK_FIELDS)
+        links.extend(s.get("videoUrl") for s in course.get("contentSections") or [])
+    return [u for u in links if u]
+
+
+def apply_results(courses: list, results: dict, prune: bool = False) -> dict:
+    """
+    Rewrite redirected links, then flag (or prune) dead and non-video links. Links that could
+    not be checked (state "unknown") are flagged but never pruned. Returns counts.
+    """
+    counts = {"dead": 0, "unknown": 0, "notVideo": 0, "redirected": 0}
+
+    def resolve(url):
+        result = results.get(url)
+        if result is None:
+            return url, None
+        if result["ok"] and result["finalUrl"] != url:
+            counts["redirected"] += 1
+            return result["finalUrl"], result
+        return url, result
+
+    for course in courses:
+        issues = []
+        for field in COURSE_LINK_FIELDS:
+            url, result = resolve(course.get(field))
+            if result is None:
+                continue
+            course[field] = url
+            state = link_state(result)
+            if state == "unknown":
+                counts["unknown"] += 1
+                issues.append({"field": field, "url": url, "status": result["status"], "problem": "unknown"})
+            elif state == "dead":
+                counts["dead"] += 1
+                issues.append({"field": field, "url": url, "status": result["status"]})
+                if prune and field == "enrollmentLink":
+                    course[field] = None
+        for section in course.get("contentSections") or []:
+            url, result = resolve(section.get("videoUrl"))
+            if result is None:
+                continue
+            section["videoUrl"] = url
+            problem = None
+            if link_state(result) == "unknown":
+                counts["unknown"] += 1
+                issues.append({"field": "videoUrl", "url": url, "status": result["status"], "problem": "unknown"})
+                continue
+            if not result["ok"]:
+                counts["dead"] += 1
+                problem = "dead"
+            elif not is_video_url(url, result["contentType"]):
+                counts["notVideo"] += 1
+                problem = "notVideo"
+            if problem and prune:
+                section["videoUrl"] = None
+                if section.get("type") == "video":
+                    section["type"] = "text"
+            elif problem:
+                issues.append({"field": "videoUrl", "url": url, "status": result["status"], "problem": problem})
+        if issues and not prune:
+            course["linkIssues"] = issues
+        else:
+            course.pop("linkIssues", None)
+    return counts
+
+
+def validate_courses(courses: list, validator: LinkValidator, prune: bool = False) -> dict:
+    """Check every outbound link of courses (in place); returns counts including checked links."""
+    results = validator.check_many(catalog_links(courses))
+    counts = apply_results(courses, results, prune)
+    counts["checked"] = len(results)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate enrollmentLink/sourceUrl/videoUrl links of a course catalog")
+    parser.add_argument("file", type=Path, help="Catalog JSON (scraper output or training courses)")
+    parser.add_argument("--out", type=Path, help="Write the result here (default: overwrite the input)")
+    parser.add_argument("--prune", action="store_true", help="Remove dead/non-video links instead of flagging them")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--per-host", type=int, default=4, help="Max concurrent checks per host")
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--ttl-hours", type=float, default=DEFAULT_TTL_SEC / 3600, help="Cache lifetime of a check result")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as f:
+        data = json.load(f)
+    cache = None if args.no_cache else LinkCache(DEFAULT_CACHE, args.ttl_hours * 3600)
+    validator = LinkValidator(cache, args.concurrency, args.per_host, args.timeout)
+    started = time.perf_counter()
+    counts = validate_courses(catalog_courses(data), validator, args.prune)
+    out = args.out or args.file
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    print("Checked {checked} link(s): {dead} dead, {unknown} unreachable for now, {notVideo} not video, {redirected} redirected".format(**counts),
+          "in {:.1f}s; written to {}".format(time.perf_counter() - started, out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
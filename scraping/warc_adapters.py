@@ -0,0 +1,42 @@
+"""
+requests transport adapters for WARC record/replay (see warc_archive.py).
+"""
+
+import io
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from warc_archive import WarcArchive, WarcWriter
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that writes every exchange to a WarcWriter."""
+
+    def __init__(self, writer: WarcWriter, **kwargs):
+        super().__init__(**kwargs)
+        self.writer = writer
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if not kwargs.get("stream"):
+            self.writer.write(response)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """HTTPAdapter that answers from a WarcArchive; unknown URLs raise ConnectionError."""
+
+    def __init__(self, archive: WarcArchive, **kwargs):
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        found = self.archive.lookup(request.url)
+        if found is None:
+            raise requests.ConnectionError("Not in WARC archive: {}".format(request.url), request=request)
+        status, reason, headers, body = found
+        raw = HTTPResponse(body=io.BytesIO(body), headers=headers, status=status, reason=reason,
+                           preload_content=False, decode_content=False)
+        return self.build_response(request, raw)
@@ -0,0 +1,256 @@
+"""
+WARC record/replay for scraper fetches.
+
+Record mode writes every request/response pair fetched through a requests session into
+gzip-per-record WARC files (one file per process) plus a sidecar offset list. Replay
+mode serves fetches from those archives without touching the network: a binary index
+of (URL hash, file, offset, length) is built from the sidecars, memory-mapped and
+binary-searched, and the record is read from the memory-mapped WARC file. Polite
+delays (REQUEST_DELAY) are skipped while replaying.
+
+Bodies are stored as delivered by requests (transfer/content encodings already decoded),
+and the matching headers are dropped, so archives replay byte-for-byte into the parsers.
+Responses fetched with stream=True are not recorded by the adapter (their body has not been
+read yet); callers that stream a body to disk archive it with record_download() afterwards.
+Replay serves such bodies from memory like any other record.
+
+Usage from a scraper:
+  add_arguments(parser); configure_from_args(args)   # --record DIR / --replay DIR
+  session = requests.Session(); install(session)
+  polite_sleep(REQUEST_DELAY_SEC)
+
+The requests adapters live in warc_adapters.py and are only imported by install() when a
+mode is configured, so importing this module does not load requests.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+INDEX_FILE = "index.bin"
+INDEX_META = "index.json"
+# url hash (first 8 bytes of SHA-1), file number, offset, length
+_ENTRY = struct.Struct(">QIQI")
+_DROP_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection"}
+
+_mode = {"record": None, "replay": None}
+
+
+def url_key(url: str) -> int:
+    return int.from_bytes(hashlib.sha1(url.encode("utf-8")).digest()[:8], "big")
+
+
+def _warc_record(warc_type: str, url: str, block: bytes, extra: Optional[dict] = None) -> tuple:
+    record_id, head = _warc_head(warc_type, url, len(block), extra)
+    return record_id, head + block + b"\r\n\r\n"
+
+
+def _warc_head(warc_type: str, url: str, length: int, extra: Optional[dict] = None) -> tuple:
+    record_id = "<urn:uuid:{}>".format(uuid.uuid4())
+    headers = [
+        ("WARC-Type", warc_type),
+        ("WARC-Record-ID", record_id),
+        ("WARC-Date", datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")),
+        ("WARC-Target-URI", url),
+        ("Content-Type", "application/http; msgtype={}".format(warc_type)),
+        ("Content-Length", str(length)),
+    ]
+    headers.extend((extra or {}).items())
+    head = "WARC/1.1\r\n" + "".join("{}: {}\r\n".format(k, v) for k, v in headers) + "\r\n"
+    return record_id, head.encode("utf-8")
+
+
+class WarcWriter:
+    """Appends request/response records to <dir>/crawl-<time>-<pid>.warc.gz."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = "crawl-{}-{}".format(time.strftime("%Y%m%d%H%M%S"), os.getpid())
+        self.path = self.directory / (stem + ".warc.gz")
+        self.sidecar = self.directory / (stem + ".offsets")
+        self._lock = threading.Lock()
+
+    def write(self, response: requests.Response, body_path: Optional[Path] = None):
+        """Append response (and its request); with body_path, the body is copied from that file."""
+        request = response.request
+        url = request.url
+        req_block = "{} {} HTTP/1.1\r\n".format(request.method, request.path_url)
+        req_block += "".join("{}: {}\r\n".format(k, v) for k, v in request.headers.items()) + "\r\n"
+        body = request.body or b""
+        req_block = req_block.encode("utf-8") + (body.encode("utf-8") if isinstance(body, str) else body)
+        status = "HTTP/1.1 {} {}\r\n".format(response.status_code, response.reason or "")
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS]
+        length = os.path.getsize(body_path) if body_path is not None else len(response.content)
+        headers.append(("Content-Length", str(length)))
+        http_head = (status + "".join("{}: {}\r\n".format(k, v) for k, v in headers) + "\r\n").encode("utf-8")
+        resp_id, warc_head = _warc_head("response", url, len(http_head) + length)
+        _, req_record = _warc_record("request", url, req_block, {"WARC-Concurrent-To": resp_id})
+        with self._lock, open(self.path, "ab") as f, open(self.sidecar, "a", encoding="utf-8") as side:
+            offset = f.tell()
+            # One gzip member per record; large bodies are copied in chunks, never held whole.
+            with gzip.GzipFile(filename="", mode="wb", fileobj=f) as member:
+                member.write(warc_head + http_head)
+                if body_path is None:
+                    member.write(response.content)
+                else:
+                    with open(body_path, "rb") as body:
+                        for chunk in iter(lambda: body.read(1 << 16), b""):
+                            member.write(chunk)
+                member.write(b"\r\n\r\n")
+            member_length = f.tell() - offset
+            f.write(gzip.compress(req_record))
+            # Only responses are indexed for replay.
+            if request.method == "GET":
+                side.write("{}\t{}\t{}\n".format(offset, member_length, url))
+
+
+class WarcArchive:
+    """Read side: memory-mapped offset index over every WARC file in a directory."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.files = self._ensure_index()
+        self._index_file = open(self.directory / INDEX_FILE, "rb")
+        size = os.fstat(self._index_file.fileno()).st_size
+        self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._count = size // _ENTRY.size
+        self._maps = {}
+        self._lock = threading.Lock()
+
+    def _ensure_index(self) -> list:
+        """(Re)build index.bin when WARC files were added or grew since it was written."""
+        sidecars = sorted(self.directory.glob("*.offsets"))
+        state = {p.name: p.stat().st_size for p in sidecars}
+        meta_path = self.directory / INDEX_META
+        if meta_path.exists() and (self.directory / INDEX_FILE).exists():
+            meta = json.loads(meta_path.read_text())
+            if meta.get("sidecars") == state:
+                return meta["files"]
+        files = [p.name[: -len(".offsets")] + ".warc.gz" for p in sidecars]
+        entries = []
+        for file_no, sidecar in enumerate(sidecars):
+            with open(sidecar, encoding="utf-8") as f:
+                for line in f:
+                    offset, length, url = line.rstrip("\n").split("\t", 2)
+                    entries.append((url_key(url), file_no, int(offset), int(length)))
+        # Stable sort: for a URL recorded several times the newest record comes last.
+        entries.sort(key=lambda e: e[0])
+        tmp = self.directory / (INDEX_FILE + ".tmp")
+        with open(tmp, "wb") as f:
+            for entry in entries:
+                f.write(_ENTRY.pack(*entry))
+        os.replace(tmp, self.directory / INDEX_FILE)
+        meta_path.write_text(json.dumps({"files": files, "sidecars": state}))
+        return files
+
+    def _entry(self, i: int) -> tuple:
+        return _ENTRY.unpack_from(self._index, i * _ENTRY.size)
+
+    def _map(self, file_no: int) -> mmap.mmap:
+        with self._lock:
+            if file_no not in self._maps:
+                with open(self.directory / self.files[file_no], "rb") as f:
+                    self._maps[file_no] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._maps[file_no]
+
+    def lookup(self, url: str) -> Optional[tuple]:
+        """Latest recorded (status, reason, headers, body) for url, or None."""
+        key = url_key(url)
+        keys = _KeyView(self)
+        i = bisect_left(keys, key)
+        matches = []
+        while i < self._count and self._entry(i)[0] == key:
+            matches.append(self._entry(i))
+            i += 1
+        for _, file_no, offset, length in reversed(matches):
+            record = gzip.decompress(self._map(file_no)[offset:offset + length])
+            warc_head, _, rest = record.partition(b"\r\n\r\n")
+            if "WARC-Target-URI: {}\r\n".format(url).encode("utf-8") not in warc_head + b"\r\n":
+                continue  # hash collision
+            http_head, _, body = rest.partition(b"\r\n\r\n")
+            lines = http_head.decode("utf-8", "replace").split("\r\n")
+            _, status, reason = (lines[0].split(" ", 2) + [""])[:3]
+            headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+            length_hdr = int(headers.get("Content-Length", len(body) - 4))
+            return int(status), reason, headers, body[:length_hdr]
+        return None
+
+
+class _KeyView:
+    """Sequence of index keys for bisect, read straight from the mmap."""
+
+    def __init__(self, archive: WarcArchive):
+        self.archive = archive
+
+    def __len__(self):
+        return self.archive._count
+
+    def __getitem__(self, i):
+        return self.archive._entry(i)[0]
+
+
+def configure(record_dir=None, replay_dir=None):
+    """Select the process-wide mode used by install() and polite_sleep()."""
+    if record_dir and replay_dir:
+        raise ValueError("--record and --replay are mutually exclusive")
+    _mode["record"] = WarcWriter(record_dir) if record_dir else None
+    _mode["replay"] = WarcArchive(replay_dir) if replay_dir else None
+
+
+def add_arguments(parser):
+    parser.add_argument("--record", metavar="DIR", help="Record every fetch into WARC files in DIR")
+    parser.add_argument("--replay", metavar="DIR", help="Serve fetches from the WARC files in DIR (no network, no delays)")
+
+
+def configure_from_args(args):
+    configure(args.record, args.replay)
+
+
+def replaying() -> bool:
+    return _mode["replay"] is not None
+
+
+def recording() -> bool:
+    return _mode["record"] is not None
+
+
+def record_download(response: requests.Response, body_path: Path):
+    """Archive a stream=True response whose body was saved to body_path (no-op unless recording)."""
+    if _mode["record"] is not None:
+        _mode["record"].write(response, body_path)
+
+
+def install(session: requests.Session) -> requests.Session:
+    """Mount the recording or replay adapter on session, if a mode is configured."""
+    if _mode["replay"] is None and _mode["record"] is None:
+        return session
+    from warc_adapters import RecordingAdapter, ReplayAdapter
+
+    if _mode["replay"] is not None:
+        adapter = ReplayAdapter(_mode["replay"])
+    else:
+        adapter = RecordingAdapter(_mode["record"])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def polite_sleep(seconds: float):
+    """time.sleep(seconds), except while replaying from an archive."""
+    if not replaying():
+        time.sleep(seconds)
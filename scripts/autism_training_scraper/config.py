@@ -30,3 +30,20 @@ HEADERS = {
 
 # Delay between requests (seconds) to be polite
 REQUEST_DELAY = 2
+
+# Max characters of section text (titles, paragraphs, list items) kept per course
+COURSE_CHAR_BUDGET = 12000
+
+# Landing pages whose linked PDF / office documents are ingested by documents.py
+DOCUMENT_SOURCES = [NHS_AUTISM_RESOURCES, NAS_ELEARNING, TEACCH_TRAINING]
+DOCUMENT_EXTENSIONS = (".pdf", ".docx", ".pptx")
+# Larger downloads are abandoned (bytes)
+MAX_DOCUMENT_BYTES = 200 * 1024 * 1024
+
+# Content images (images.py): originals above this size are skipped (bytes), images smaller
+# than IMAGE_MIN_DIMENSION px on either side are treated as decoration, and thumbnails are
+# WebP with the longest side at most THUMBNAIL_SIZE px.
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+IMAGE_MIN_DIMENSION = 64
+THUMBNAIL_SIZE = 640
+THUMBNAIL_QUALITY = 75
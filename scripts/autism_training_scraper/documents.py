@@ -0,0 +1,415 @@
+"""
+Ingest PDF and office documents (.docx, .pptx) linked from training landing pages.
+
+Documents are streamed to disk in chunks (never held whole in memory), REQUEST_DELAY apart,
+and re-downloaded only when the server reports a change (ETag / Last-Modified). With --record
+they are always fetched in full and the streamed bodies are archived, so --replay reproduces
+an ingestion run. Text is then extracted page by page (PDF pages, PPTX slides) in a process
+pool, each worker reading the file through mmap, and turned into contentSections of the same
+shape as scraper.extract_sections(). Extraction stops once the course's char budget is filled,
+so large manuals are ingested with bounded memory.
+PDF support needs pypdf (pip install -r requirements.txt), imported on the first PDF.
+
+Usage:
+  python documents.py --out document_courses.json                     # DOCUMENT_SOURCES in config.py
+  python documents.py --page https://teacch.com/training/ --max-documents 5
+"""
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import json
+import mmap
+import os
+import re
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import urljoin, urlparse
+
+from config import COURSE_CHAR_BUDGET, DOCUMENT_EXTENSIONS, DOCUMENT_SOURCES, HEADERS, MAX_DOCUMENT_BYTES, REQUEST_DELAY
+from normalize import compact_sections, element_text, normalize_text
+from scraper import SCRAPING_DIR, add_warc_arguments, can_fetch, configure_from_args, fetch_page, fetch_robots_txt, get_session
+
+from parse_cache import cached_parse  # noqa: E402  (scraping/ is on sys.path via scraper)
+from warc_archive import polite_sleep, record_download, recording  # noqa: E402
+
+DOCUMENT_DIR = SCRAPING_DIR / "cache" / "documents"
+# Bump when the sections produced for the same document change (invalidates cached extractions).
+DOCUMENT_EXTRACTOR_VERSION = 1
+CHUNK_SIZE = 1 << 16
+PAGES_PER_TASK = 4
+# PDFs kept open (mmap + PdfReader) per process.
+MAX_OPEN_PDFS = 2
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_BULLET = re.compile(r"^\s*(?:[•▪◦●‣∙·*\-–—]|\(?\d{1,2}[.)]|[a-z][.)])\s+(.+)")
+_SENTENCE_END = re.compile(r"[.!?:;,]$")
+
+
+def document_kind(url: str) -> str | None:
+    path = urlparse(url).path.lower()
+    return next((ext for ext in DOCUMENT_EXTENSIONS if path.endswith(ext)), None)
+
+
+def discover_documents(page_url: str) -> list[tuple[str, str]]:
+    """(url, link text) of the documents linked from an HTML page."""
+    html = fetch_page(page_url)
+    if not html:
+        return []
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    found: dict[str, str] = {}
+    for a in soup.find_all("a", href=True):
+        url = urljoin(page_url, a["href"]).split("#")[0]
+        if document_kind(url) and url not in found:
+            found[url] = element_text(a)
+    return list(found.items())
+
+
+def download(url: str, dest_dir: Path = DOCUMENT_DIR) -> tuple[Path, str] | None:
+    """
+    Stream url to dest_dir; returns (path, sha256 of the file) or None when the document is
+    disallowed, unreachable or larger than MAX_DOCUMENT_BYTES. Unchanged files are not re-fetched.
+    """
+    kind = document_kind(url)
+    parsed = urlparse(url)
+    if not can_fetch(fetch_robots_txt(f"{parsed.scheme}://{parsed.netloc}"), url, HEADERS["User-Agent"]):
+        print(f"Skip (robots.txt): {url}")
+        return None
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    stem = hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+    path = dest_dir / (stem + (kind or ""))
+    meta_path = dest_dir / (stem + ".json")
+    # While recording, fetch in full so the archive holds the body.
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() and path.exists() and not recording() else {}
+    headers = {"Accept": "*/*"}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("lastModified"):
+        headers["If-Modified-Since"] = meta["lastModified"]
+    tmp = path.with_suffix(path.suffix + ".part")
+    polite_sleep(REQUEST_DELAY)
+    try:
+        with get_session().get(url, headers=headers, timeout=30, stream=True) as r:
+            if r.status_code == 304:
+                return path, meta["sha256"]
+            r.raise_for_status()
+            if int(r.headers.get("Content-Length") or 0) > MAX_DOCUMENT_BYTES:
+                print(f"Skip (too large): {url}")
+                return None
+            digest = hashlib.sha256()
+            size = 0
+            with open(tmp, "wb") as f:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_DOCUMENT_BYTES:
+                        print(f"Skip (too large): {url}")
+                        return None
+                    digest.update(chunk)
+                    f.write(chunk)
+            os.replace(tmp, path)
+            record_download(r, path)
+            meta = {
+                "url": url,
+                "sha256": digest.hexdigest(),
+                "etag": r.headers.get("ETag"),
+                "lastModified": r.headers.get("Last-Modified"),
+            }
+            meta_path.write_text(json.dumps(meta))
+            return path, meta["sha256"]
+    except Exception as e:
+        print(f"Error downloading {url}: {e}")
+        return None
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+# --- Page extraction (runs in worker processes) ---
+
+# "path:mtime" -> (PdfReader, mmap), least recently used first
+_open_pdfs: OrderedDict[str, tuple[Any, mmap.mmap]] = OrderedDict()
+
+
+def _pdf(path: str):
+    """PdfReader over an mmap of path, kept open per process (and file version) while in use."""
+    key = f"{path}:{os.stat(path).st_mtime_ns}"
+    entry = _open_pdfs.get(key)
+    if entry is None:
+        from pypdf import PdfReader
+
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        entry = _open_pdfs[key] = (PdfReader(data), data)
+        while len(_open_pdfs) > MAX_OPEN_PDFS:
+            _, (_, old) = _open_pdfs.popitem(last=False)
+            old.close()
+    _open_pdfs.move_to_end(key)
+    return entry[0]
+
+
+def close_pdfs():
+    """Drop this process's open PDFs and unmap them."""
+    while _open_pdfs:
+        _, (_, data) = _open_pdfs.popitem()
+        data.close()
+
+
+def _slide_names(path: str) -> list[str]:
+    with zipfile.ZipFile(path) as z:
+        names = [n for n in z.namelist() if re.fullmatch(r"ppt/slides/slide\d+\.xml", n)]
+    return sorted(names, key=lambda n: int(re.search(r"(\d+)\.xml$", n).group(1)))
+
+
+def _slide_text(z: zipfile.ZipFile, name: str) -> str:
+    """Slide paragraphs, one per line; the first one is usually the slide title."""
+    with z.open(name) as f:
+        root = ET.parse(f).getroot()
+    lines = ["".join(t.text or "" for t in p.iter(_A + "t")) for p in root.iter(_A + "p")]
+    first, *rest = [line for line in lines if line.strip()] or [""]
+    return "\n".join([first] + [f"• {line}" for line in rest])
+
+
+def extract_pages(task: tuple[str, str, int, int]) -> list[str]:
+    """Plain text of pages [start, stop) of one document."""
+    kind, path, start, stop = task
+    if kind == ".pdf":
+        reader = _pdf(path)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+    names = _slide_names(path)[start:stop]
+    with zipfile.ZipFile(path) as z:
+        return [_slide_text(z, name) for name in names]
+
+
+def page_count(kind: str, path: Path) -> int:
+    if kind == ".pdf":
+        return len(_pdf(str(path)).pages)
+    return len(_slide_names(str(path)))
+
+
+# --- Text to contentSections ---
+
+def _is_heading(line: str) -> bool:
+    words = line.split()
+    return (
+        0 < len(words) <= 12
+        and len(line) <= 90
+        and not _SENTENCE_END.search(line)
+        and (line[0].isupper() or line[0].isdigit())
+        and not line.isdigit()
+    )
+
+
+def text_to_sections(text: str) -> list[dict[str, Any]]:
+    """Split extracted page text into heading / paragraph / list sections (extract_sections shape)."""
+    sections: list[dict[str, Any]] = []
+    paragraph: list[str] = []
+    items: list[str] = []
+
+    def flush():
+        if paragraph:
+            content = normalize_text(" ".join(paragraph))
+            if len(content) >= 10:
+                sections.append({"type": "text", "content": content, "videoUrl": None, "order": 0})
+            paragraph.clear()
+        if items:
+            sections.append({"type": "list", "listItems": [normalize_text(i) for i in items], "order": 0})
+            items.clear()
+
+    lines = [raw.strip() for raw in text.splitlines()]
+    for i, line in enumerate(lines):
+        if not line:
+            flush()
+            continue
+        # A following line starting in lowercase continues this one (wrapped text, not a heading).
+        continued = i + 1 < len(lines) and lines[i + 1][:1].islower()
+        bullet = _BULLET.match(line)
+        if bullet:
+            if paragraph:
+                flush()
+            items.append(bullet.group(1))
+        elif items and line[0].islower():
+            items[-1] += " " + line  # wrapped bullet
+        elif _is_heading(line) and not continued and not (paragraph and not _SENTENCE_END.search(paragraph[-1])):
+            flush()
+            sections.append({"type": "text", "title": normalize_text(line), "content": "", "order": 0})
+        else:
+            if items:
+                flush()
+            if paragraph and paragraph[-1].endswith("-"):
+                paragraph[-1] = paragraph[-1][:-1] + line  # hyphenated line break
+            else:
+                paragraph.append(line)
+    flush()
+    return sections
+
+
+def docx_sections(path: Path) -> Iterator[dict[str, Any]]:
+    """Stream word/document.xml paragraph by paragraph (headings, list items, body text)."""
+    items: list[str] = []
+    with zipfile.ZipFile(path) as z, z.open("word/document.xml") as f:
+        for _, el in ET.iterparse(f, events=("end",)):
+            if el.tag != _W + "p":
+                continue
+            text = normalize_text("".join(t.text or "" for t in el.iter(_W + "t")))
+            style_el = el.find(f"{_W}pPr/{_W}pStyle")
+            style = (style_el.get(_W + "val") or "") if style_el is not None else ""
+            is_item = el.find(f"{_W}pPr/{_W}numPr") is not None or "List" in style
+            el.clear()
+            if not text:
+                continue
+            if is_item:
+                items.append(text)
+                continue
+            if items:
+                yield {"type": "list", "listItems": items, "order": 0}
+                items = []
+            if style.startswith(("Heading", "Title")):
+                yield {"type": "text", "title": text, "content": "", "order": 0}
+            elif len(text) >= 10:
+                yield {"type": "text", "content": text, "videoUrl": None, "order": 0}
+    if items:
+        yield {"type": "list", "listItems": items, "order": 0}
+
+
+def _section_chars(section: dict[str, Any]) -> int:
+    return len(section.get("title") or "") + len(section.get("content") or "") + sum(map(len, section.get("listItems") or []))
+
+
+def extract_document(
+    kind: str,
+    path: Path,
+    char_budget: int | None = COURSE_CHAR_BUDGET,
+    workers: int | None = None,
+) -> list[dict[str, Any]]:
+    """Compacted contentSections of a downloaded document; stops reading once char_budget is filled."""
+    # Compaction drops duplicates, so read some margin past the budget.
+    limit = char_budget * 2 if char_budget else None
+    sections: list[dict[str, Any]] = []
+    chars = 0
+    if kind == ".docx":
+        for section in docx_sections(path):
+            sections.append(section)
+            chars += _section_chars(section)
+            if limit and chars > limit:
+                break
+    else:
+        if kind == ".pdf" and importlib.util.find_spec("pypdf") is None:
+            raise RuntimeError("PDF ingestion needs pypdf: pip install -r requirements.txt")
+        count = page_count(kind, path)
+        tasks = [(kind, str(path), i, min(i + PAGES_PER_TASK, count)) for i in range(0, count, PAGES_PER_TASK)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields in page order; leaving the loop early cancels the pages not started yet.
+            results = pool.map(extract_pages, tasks)
+            for pages in results:
+                for text in pages:
+                    for section in text_to_sections(text):
+                        sections.append(section)
+                        chars += _section_chars(section)
+                if limit and chars > limit:
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    break
+    return compact_sections(sections, char_budget)
+
+
+def document_title(kind: str, path: Path, link_text: str, url: str) -> str:
+    if kind == ".pdf":
+        try:
+            title = (_pdf(str(path)).metadata or {}).get("/Title")
+            if title and str(title).strip():
+                return normalize_text(str(title))[:200]
+        except Exception:
+            pass
+    if link_text:
+        return link_text[:200]
+    return Path(urlparse(url).path).name or url
+
+
+def scrape_document(
+    url: str,
+    link_text: str = "",
+    char_budget: int | None = COURSE_CHAR_BUDGET,
+    workers: int | None = None,
+) -> dict[str, Any] | None:
+    """Download and extract one document into a course-like structure (same shape as scrape_url)."""
+    kind = document_kind(url)
+    if not kind:
+        print(f"Skip (not a supported document): {url}")
+        return None
+    got = download(url)
+    if got is None:
+        return None
+    path, digest = got
+    try:
+        sections = cached_parse(
+            None, "documents", DOCUMENT_EXTRACTOR_VERSION,
+            lambda: extract_document(kind, path, char_budget, workers),
+            context=str(char_budget or 0), digest=digest,
+        )
+        title = document_title(kind, path, link_text, url)
+    except Exception as e:
+        print(f"Error extracting {url}: {e}")
+        return None
+    finally:
+        close_pdfs()
+    first_text = next((s["content"] for s in sections if s.get("content")), "")
+    return {
+        "title": title,
+        "description": first_text[:500] or f"Training document from {url}",
+        "contentSections": sections,
+        "sourceUrl": url,
+        "topics": [],
+        "quiz": [],
+        "approved": False,
+        "order": 0,
+    }
+
+
+def scrape_documents(
+    pages: list[str] | None = None,
+    char_budget: int | None = COURSE_CHAR_BUDGET,
+    max_documents: int | None = None,
+    workers: int | None = None,
+) -> list[dict[str, Any]]:
+    """One course per document linked from pages (default: DOCUMENT_SOURCES)."""
+    courses = []
+    for page in pages or DOCUMENT_SOURCES:
+        found = discover_documents(page)
+        print(f"{page}: {len(found)} document(s)")
+        for url, link_text in found[:max_documents]:
+            course = scrape_document(url, link_text, char_budget, workers)
+            if course and course["contentSections"]:
+                courses.append(course)
+    return courses
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Ingest PDF/office training documents for CogniCare")
+    parser.add_argument("--page", action="append", help="Landing page to collect document links from (default: DOCUMENT_SOURCES)")
+    parser.add_argument("--document", action="append", default=[], help="Document URL to ingest directly")
+    parser.add_argument("--out", default="document_courses.json", help="Output JSON file")
+    parser.add_argument("--max-documents", type=int, help="Max documents per landing page")
+    parser.add_argument("--workers", type=int, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--char-budget", type=int, default=COURSE_CHAR_BUDGET, help="Max text characters per course (0 = unlimited)")
+    add_warc_arguments(parser)
+    args = parser.parse_args()
+    configure_from_args(args)
+    char_budget = args.char_budget or None
+
+    if args.document:
+        courses = [c for c in (scrape_document(u, "", char_budget, args.workers) for u in args.document) if c]
+    else:
+        courses = scrape_documents(args.page, char_budget, args.max_documents, args.workers)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(courses, f, indent=2, ensure_ascii=False)
+    print(f"Wrote {len(courses)} course(s) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
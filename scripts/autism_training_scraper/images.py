@@ -0,0 +1,350 @@
+"""
+Content images for training courses: download, perceptual deduplication and WebP thumbnails.
+
+extract_sections() turns <img> / <figure> into "image" sections pointing at the source
+image. This stage downloads every image URL of a run once (through the shared session, with
+robots.txt checked once per host and REQUEST_DELAY between fetches of the same host, hosts in
+parallel), then decodes them in a process pool: each worker writes a WebP thumbnail (longest
+side THUMBNAIL_SIZE) and computes a 64-bit difference hash (dHash). Images whose hashes differ
+in at most DUPLICATE_DISTANCE bits are the same picture (re-encoded, resized, re-hosted); the
+largest original is kept and repeats within a course are dropped.
+
+Image sections then carry:
+  imageFile                 thumbnail path, relative to scraping/, until uploaded
+  imageWidth / imageHeight  thumbnail size in pixels
+  imageHash                 dHash (hex), the Cloudinary publicId
+  imageUrl                  source image, until replaced by the uploaded thumbnail URL
+Sections whose image cannot be fetched or decoded are dropped. Originals are kept in
+scraping/cache/images/ and are not re-downloaded; thumbnails and hashes are cached per original
+(sha256) in the parse cache. Sections that already have an imageHash are left as they are, so
+the stage can be re-run on its own output. Needs Pillow (pip install -r requirements.txt).
+
+With --upload, each distinct thumbnail is posted once to the backend
+(POST /training/admin/images, stored by CloudinaryService.uploadBuffer with publicId=imageHash);
+imageUrl becomes the returned URL and imageFile is removed, so the JSON can be posted to
+/training/admin/courses. Thumbnails that fail to upload keep imageFile and are retried on the
+next --upload run.
+
+Usage:
+  python scraper.py --scrape-courses --images --out training_courses.json
+  python images.py training_courses.json --out training_courses.json
+  COGNICARE_ADMIN_TOKEN=... python images.py training_courses.json --upload
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+from urllib.parse import urlparse
+
+from config import HEADERS, IMAGE_MIN_DIMENSION, MAX_IMAGE_BYTES, REQUEST_DELAY, THUMBNAIL_QUALITY, THUMBNAIL_SIZE
+from scraper import SCRAPING_DIR, add_warc_arguments, can_fetch, configure_from_args, fetch_robots_txt, get_session
+
+from parse_cache import default_cache  # noqa: E402  (scraping/ is on sys.path via scraper)
+from warc_archive import polite_sleep  # noqa: E402
+
+if TYPE_CHECKING:
+    import requests
+
+IMAGE_DIR = SCRAPING_DIR / "cache" / "images"
+THUMBNAIL_DIR = SCRAPING_DIR / "cache" / "thumbnails"
+# Bump when thumbnails or hashes change for the same original (invalidates cached results).
+IMAGE_PROCESSOR_VERSION = 1
+# Max differing dHash bits between two copies of one picture; must stay below HASH_BANDS.
+DUPLICATE_DISTANCE = 6
+HASH_BANDS = 8
+MAX_HOSTS = 8
+CHUNK_SIZE = 1 << 16
+DEFAULT_API_URL = "http://localhost:3000/api/v1"
+
+
+def _stem(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+
+
+def download_image(url: str, dest_dir: Path = IMAGE_DIR) -> tuple[Path, str] | None:
+    """
+    Stream one image to dest_dir; returns (path, sha256) or None when it is not an image,
+    unreachable or larger than MAX_IMAGE_BYTES. Images already on disk are not re-fetched.
+    """
+    stem = _stem(url)
+    path = dest_dir / stem
+    meta_path = dest_dir / (stem + ".json")
+    if path.exists() and meta_path.exists():
+        return path, json.loads(meta_path.read_text())["sha256"]
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".part")
+    try:
+        with get_session().get(url, headers={"Accept": "image/*"}, timeout=30, stream=True) as r:
+            r.raise_for_status()
+            if not r.headers.get("Content-Type", "image/").startswith("image/"):
+                return None
+            if int(r.headers.get("Content-Length") or 0) > MAX_IMAGE_BYTES:
+                print(f"Skip (too large): {url}")
+                return None
+            digest = hashlib.sha256()
+            size = 0
+            with open(tmp, "wb") as f:
+                for chunk in r.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_IMAGE_BYTES:
+                        print(f"Skip (too large): {url}")
+                        return None
+                    digest.update(chunk)
+                    f.write(chunk)
+        os.replace(tmp, path)
+        meta_path.write_text(json.dumps({"url": url, "sha256": digest.hexdigest()}))
+        return path, digest.hexdigest()
+    except Exception as e:
+        print(f"Error downloading {url}: {e}")
+        return None
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def download_images(urls: Iterable[str]) -> dict[str, tuple[Path, str]]:
+    """{url: (path, sha256)} for the images that could be fetched; one thread per host."""
+    by_host: dict[str, list[str]] = defaultdict(list)
+    for url in dict.fromkeys(urls):
+        parsed = urlparse(url)
+        by_host[f"{parsed.scheme}://{parsed.netloc}"].append(url)
+
+    def fetch_host(origin: str) -> dict[str, tuple[Path, str]]:
+        fetched: dict[str, tuple[Path, str]] = {}
+        for url in by_host[origin]:
+            if not (IMAGE_DIR / _stem(url)).exists():
+                if not can_fetch(fetch_robots_txt(origin), url, HEADERS["User-Agent"]):
+                    print(f"Skip (robots.txt): {url}")
+                    continue
+                polite_sleep(REQUEST_DELAY)
+            got = download_image(url)
+            if got:
+                fetched[url] = got
+        return fetched
+
+    results: dict[str, tuple[Path, str]] = {}
+    if not by_host:
+        return results
+    with ThreadPoolExecutor(max_workers=min(MAX_HOSTS, len(by_host))) as pool:
+        for fetched in pool.map(fetch_host, list(by_host)):
+            results.update(fetched)
+    return results
+
+
+# --- Decoding, hashing and thumbnails (runs in worker processes) ---
+
+def dhash(image) -> int:
+    """64-bit difference hash: brightness gradients of a 9x8 grayscale copy."""
+    from PIL import Image
+
+    pixels = list(image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def make_thumbnail(task: tuple[str, str, int, int]) -> dict[str, Any] | None:
+    """Write the WebP thumbnail of one original; None when it is not a usable image."""
+    source, dest, size, quality = task
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(source) as image:
+            width, height = image.size
+            if min(width, height) < IMAGE_MIN_DIMENSION:
+                return None
+            # JPEGs are decoded directly at a reduced scale (still >= size).
+            image.draft("RGB", (size, size))
+            image = ImageOps.exif_transpose(image)
+            alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+            image = image.convert("RGBA" if alpha else "RGB")
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            image.save(dest, "WEBP", quality=quality, method=4)
+            return {
+                "hash": dhash(image),
+                "width": image.width,
+                "height": image.height,
+                "originalPixels": width * height,
+            }
+    except Exception as e:
+        print(f"Error decoding {source}: {e}")
+        return None
+
+
+def process_images(
+    originals: dict[str, tuple[Path, str]],
+    workers: int | None = None,
+) -> dict[str, dict[str, Any]]:
+    """{url: thumbnail info} for downloaded originals; cached per original sha256."""
+    cache = default_cache()
+    context = f"{THUMBNAIL_SIZE}:{THUMBNAIL_QUALITY}"
+    results: dict[str, dict[str, Any]] = {}
+    pending: dict[str, tuple[str, str, int, int]] = {}
+    for url, (path, digest) in originals.items():
+        dest = THUMBNAIL_DIR / f"{digest[:20]}.webp"
+        info = cache.get(digest, "images", str(IMAGE_PROCESSOR_VERSION), context) if cache else None
+        if info and dest.exists():
+            results[url] = info
+        else:
+            pending[url] = (str(path), str(dest), THUMBNAIL_SIZE, THUMBNAIL_QUALITY)
+    if pending:
+        THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for url, info in zip(pending, pool.map(make_thumbnail, pending.values(), chunksize=4)):
+                if info is None:
+                    continue
+                info["file"] = Path(pending[url][1]).relative_to(SCRAPING_DIR).as_posix()
+                results[url] = info
+                if cache:
+                    cache.put(originals[url][1], "images", str(IMAGE_PROCESSOR_VERSION), info, context)
+    return results
+
+
+def duplicate_of(hashes: dict[str, int], preference: Iterable[str], max_distance: int = DUPLICATE_DISTANCE) -> dict[str, str]:
+    """
+    {key: canonical key} for near-duplicate hashes, visiting keys in preference order.
+    With max_distance < HASH_BANDS, two hashes within max_distance bits agree on at least one
+    8-bit band, so only keys sharing a band are compared.
+    """
+    width = 64 // HASH_BANDS
+    mask = (1 << width) - 1
+    buckets: dict[tuple[int, int], list[str]] = defaultdict(list)
+    canonical: dict[str, str] = {}
+    for key in preference:
+        value = hashes[key]
+        bands = [(band, (value >> (band * width)) & mask) for band in range(HASH_BANDS)]
+        match = next(
+            (other for band in bands for other in buckets[band] if (value ^ hashes[other]).bit_count() <= max_distance),
+            None,
+        )
+        if match is not None:
+            canonical[key] = match
+            continue
+        canonical[key] = key
+        for band in bands:
+            buckets[band].append(key)
+    return canonical
+
+
+def attach_images(courses: list[dict[str, Any]], workers: int | None = None) -> int:
+    """Point image sections of courses at deduplicated local thumbnails (in place). Returns sections kept."""
+    urls = [
+        s["imageUrl"]
+        for c in courses
+        for s in c.get("contentSections") or []
+        if s.get("type") == "image" and s.get("imageUrl") and not s.get("imageHash")
+    ]
+    processed = process_images(download_images(urls), workers)
+    # Largest original first, so it becomes the canonical copy.
+    preference = sorted(processed, key=lambda u: processed[u]["originalPixels"], reverse=True)
+    canonical = duplicate_of({u: info["hash"] for u, info in processed.items()}, preference)
+    kept = 0
+    for course in courses:
+        seen: set[str] = set()
+        sections = []
+        for section in course.get("contentSections") or []:
+            if section.get("type") == "image" and section.get("imageHash"):
+                kept += 1
+            elif section.get("type") == "image":
+                url = canonical.get(section.get("imageUrl") or "")
+                if url is None or url in seen:
+                    continue
+                seen.add(url)
+                info = processed[url]
+                section = {
+                    **section,
+                    "imageUrl": url,
+                    "imageFile": info["file"],
+                    "imageWidth": info["width"],
+                    "imageHeight": info["height"],
+                    "imageHash": f"{info['hash']:016x}",
+                }
+                kept += 1
+            sections.append({**section, "order": len(sections)})
+        course["contentSections"] = sections
+    return kept
+
+
+def upload_image(session: requests.Session, api_url: str, path: Path, image_hash: str) -> str | None:
+    """POST one thumbnail to the backend; returns its hosted URL or None."""
+    import requests
+
+    try:
+        with open(path, "rb") as f:
+            r = session.post(
+                f"{api_url.rstrip('/')}/training/admin/images",
+                files={"file": (path.name, f, "image/webp")},
+                data={"hash": image_hash},
+                timeout=60,
+            )
+        r.raise_for_status()
+        return r.json()["imageUrl"]
+    except (OSError, requests.RequestException, ValueError, KeyError) as e:
+        print(f"Error uploading {path}: {e}")
+        return None
+
+
+def upload_images(courses: list[dict[str, Any]], api_url: str, token: str) -> tuple[int, int]:
+    """
+    Upload the local thumbnails of courses (one POST per imageHash) and point imageUrl at them,
+    in place. Returns (uploaded, failed); failed sections keep imageFile for a later run.
+    """
+    import requests
+
+    pending = {
+        s["imageHash"]: s["imageFile"]
+        for c in courses
+        for s in c.get("contentSections") or []
+        if s.get("type") == "image" and s.get("imageFile") and s.get("imageHash")
+    }
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    hosted: dict[str, str] = {}
+    for image_hash, file in pending.items():
+        url = upload_image(session, api_url, SCRAPING_DIR / file, image_hash)
+        if url:
+            hosted[image_hash] = url
+    for course in courses:
+        for section in course.get("contentSections") or []:
+            url = hosted.get(section.get("imageHash") or "")
+            if url and section.get("imageFile"):
+                section["imageUrl"] = url
+                del section["imageFile"]
+    return len(hosted), len(pending) - len(hosted)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Download, deduplicate and thumbnail the images of scraped training courses")
+    parser.add_argument("courses", help="Courses JSON (scraper.py output)")
+    parser.add_argument("--out", help="Output JSON file (default: overwrite the input)")
+    parser.add_argument("--workers", type=int, help="Thumbnail processes (default: CPU count)")
+    parser.add_argument("--upload", action="store_true", help="Upload thumbnails to the backend and replace imageUrl")
+    parser.add_argument("--api", default=os.environ.get("COGNICARE_API_URL", DEFAULT_API_URL), help="API base URL")
+    parser.add_argument("--token", default=os.environ.get("COGNICARE_ADMIN_TOKEN"), help="Admin JWT (for --upload)")
+    add_warc_arguments(parser)
+    args = parser.parse_args()
+    if args.upload and not args.token:
+        parser.error("--upload needs an admin token (--token or COGNICARE_ADMIN_TOKEN)")
+    configure_from_args(args)
+
+    with open(args.courses, encoding="utf-8") as f:
+        courses = json.load(f)
+    kept = attach_images(courses, args.workers)
+    if args.upload:
+        uploaded, failed = upload_images(courses, args.api, args.token)
+        print(f"Uploaded {uploaded} thumbnail(s), {failed} failed")
+    out = args.out or args.courses
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(courses, f, indent=2, ensure_ascii=False)
+    print(f"{kept} image section(s) with thumbnails; wrote {len(courses)} course(s) to {out}")
+
+
+if __name__ == "__main__":
+    main()
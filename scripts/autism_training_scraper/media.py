@@ -0,0 +1,276 @@
+"""
+Embedded media discovery and oEmbed metadata for video sections.
+
+Recognizes YouTube / Vimeo / Dailymotion players in <iframe>, <video> and links, maps them
+to canonical watch URLs, and resolves title, duration and thumbnail through each provider's
+oEmbed endpoint. All video URLs of a run are resolved together: each distinct URL once, with a
+per-provider concurrency limit, and results are kept in a SQLite cache so later runs and course
+views never call the providers again. Misses (404 / 401: removed, private or not embeddable)
+are cached for a day; transient failures (throttling, 5xx, timeouts) are not cached at all.
+
+Set COGNICARE_OEMBED_ENDPOINT to one URL (e.g. scraping/standin_sites.py --oembed) to send
+every lookup there instead of the real providers.
+
+image_url() picks the source of content <img> elements (lazy-loading attributes and srcset
+included, logos / icons / spacers skipped); images.py downloads and thumbnails them.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+from urllib.parse import parse_qs, urlparse
+
+from config import HEADERS, IMAGE_MIN_DIMENSION, THUMBNAIL_SIZE
+
+if TYPE_CHECKING:
+    import requests
+    from bs4 import Tag
+
+DEFAULT_CACHE = Path(__file__).resolve().parents[2] / "scraping" / "cache" / "oembed_cache.sqlite3"
+DEFAULT_TTL_SEC = 30 * 24 * 3600
+# Lookups the provider answered with MISS_STATUSES (removed/private videos) are retried sooner.
+MISS_TTL_SEC = 24 * 3600
+MISS_STATUSES = (401, 404)
+
+# provider -> oEmbed endpoint
+OEMBED_ENDPOINTS = {
+    "youtube": "https://www.youtube.com/oembed",
+    "vimeo": "https://vimeo.com/api/oembed.json",
+    "dailymotion": "https://www.dailymotion.com/services/oembed",
+}
+DEFAULT_PROVIDER_LIMIT = 4
+
+_ID = r"([\w-]{6,})"
+# (provider, host suffixes, path pattern, canonical URL template)
+_PATTERNS = [
+    ("youtube", ("youtube.com", "youtube-nocookie.com"), re.compile(rf"^/(?:embed|v|shorts|live)/{_ID}"), "https://www.youtube.com/watch?v={}"),
+    ("youtube", ("youtu.be",), re.compile(rf"^/{_ID}"), "https://www.youtube.com/watch?v={}"),
+    ("vimeo", ("player.vimeo.com",), re.compile(r"^/video/(\d+)"), "https://vimeo.com/{}"),
+    ("vimeo", ("vimeo.com",), re.compile(r"^/(?:.*/)?(\d+)/?$"), "https://vimeo.com/{}"),
+    ("dailymotion", ("dailymotion.com",), re.compile(r"^/(?:embed/)?video/([a-zA-Z0-9]+)"), "https://www.dailymotion.com/video/{}"),
+    ("dailymotion", ("dai.ly",), re.compile(r"^/([a-zA-Z0-9]+)"), "https://www.dailymotion.com/video/{}"),
+]
+
+
+def video_provider(url: str) -> tuple[str, str] | None:
+    """(provider, canonical URL) for a provider player or watch URL; None otherwise."""
+    if url.startswith("//"):
+        url = "https:" + url
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().split(":")[0]
+    if (host == "youtube.com" or host.endswith(".youtube.com")) and parsed.path == "/watch":
+        video_id = (parse_qs(parsed.query).get("v") or [""])[0]
+        return ("youtube", f"https://www.youtube.com/watch?v={video_id}") if video_id else None
+    for provider, hosts, pattern, template in _PATTERNS:
+        if any(host == h or host.endswith("." + h) for h in hosts):
+            match = pattern.match(parsed.path)
+            if match:
+                return provider, template.format(match.group(1))
+    return None
+
+
+def embed_url(tag: Tag) -> str | None:
+    """Video URL of an <iframe> or <video> element: canonical for known providers, else a video file URL."""
+    if tag.name == "iframe":
+        src = tag.get("src") or tag.get("data-src") or ""
+        found = video_provider(src)
+        return found[1] if found else None
+    src = tag.get("src") or ""
+    if not src:
+        source = tag.find("source", src=True)
+        src = source["src"] if source else ""
+    if src.startswith("//"):
+        src = "https:" + src
+    found = video_provider(src)
+    if found:
+        return found[1]
+    return src if src.startswith(("http://", "https://")) else None
+
+
+# Site chrome rather than course content, matched on the file name and class attribute.
+_DECORATIVE_IMAGE = re.compile(r"logo|icon|sprite|spacer|blank|pixel|avatar|badge|emoji|loader|placeholder", re.I)
+
+
+def _srcset_candidate(srcset: str) -> str:
+    """Smallest srcset candidate at least THUMBNAIL_SIZE wide (else the largest): enough for the thumbnail."""
+    candidates = []
+    for part in srcset.split(","):
+        fields = part.split()
+        if not fields:
+            continue
+        descriptor = fields[1] if len(fields) > 1 else "1x"
+        try:
+            # "2x" density descriptors rank like widths of a nominal 1x THUMBNAIL_SIZE image.
+            width = float(descriptor[:-1]) * (THUMBNAIL_SIZE if descriptor.endswith("x") else 1)
+        except ValueError:
+            continue
+        candidates.append((width, fields[0]))
+    if not candidates:
+        return ""
+    large_enough = [c for c in candidates if c[0] >= THUMBNAIL_SIZE]
+    return min(large_enough)[1] if large_enough else max(candidates)[1]
+
+
+def image_url(tag: Tag) -> str | None:
+    """Source URL (possibly relative) of a content <img>; None for decorative, inline or tiny images."""
+    if tag.get("role") == "presentation" or tag.get("aria-hidden") == "true":
+        return None
+    for attr in ("width", "height"):
+        size = str(tag.get(attr) or "").removesuffix("px")
+        if size.isdigit() and int(size) < IMAGE_MIN_DIMENSION:
+            return None
+    srcset = tag.get("data-srcset") or tag.get("srcset") or ""
+    src = (
+        (_srcset_candidate(srcset) if srcset else "")
+        or tag.get("data-src")
+        or tag.get("data-lazy-src")
+        or tag.get("src")
+        or ""
+    ).strip()
+    if not src or src.startswith("data:"):
+        return None
+    if src.startswith("//"):
+        src = "https:" + src
+    name = urlparse(src).path.rsplit("/", 1)[-1].lower()
+    if name.endswith(".svg") or _DECORATIVE_IMAGE.search(name) or _DECORATIVE_IMAGE.search(" ".join(tag.get("class") or [])):
+        return None
+    return src
+
+
+class OEmbedCache:
+    """SQLite cache of oEmbed lookups; misses (MISS_STATUSES) are stored too, with a shorter TTL."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE, ttl_sec: float = DEFAULT_TTL_SEC, miss_ttl_sec: float = MISS_TTL_SEC):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_sec = ttl_sec
+        self.miss_ttl_sec = miss_ttl_sec
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS oembed (url TEXT PRIMARY KEY, fetched_at REAL NOT NULL, meta TEXT)")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url: str) -> tuple[bool, dict[str, Any] | None]:
+        """(found, meta): found is False when url is not cached or expired."""
+        row = self._conn().execute("SELECT fetched_at, meta FROM oembed WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return False, None
+        meta = json.loads(row[1]) if row[1] else None
+        ttl = self.ttl_sec if meta is not None else self.miss_ttl_sec
+        if time.time() - row[0] > ttl:
+            return False, None
+        return True, meta
+
+    def put_many(self, results: dict[str, dict[str, Any] | None]):
+        conn = self._conn()
+        now = time.time()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO oembed VALUES (?, ?, ?)",
+                [(url, now, json.dumps(meta) if meta is not None else None) for url, meta in results.items()],
+            )
+
+
+class OEmbedResolver:
+    """Resolves video metadata for many URLs at once with per-provider concurrency limits."""
+
+    def __init__(
+        self,
+        cache: OEmbedCache | None = None,
+        endpoints: dict[str, str] | None = None,
+        provider_limits: dict[str, int] | None = None,
+        session: requests.Session | None = None,
+        timeout: float = 10,
+    ):
+        self.cache = cache
+        override = os.environ.get("COGNICARE_OEMBED_ENDPOINT")
+        self.endpoints = endpoints or ({p: override for p in OEMBED_ENDPOINTS} if override else dict(OEMBED_ENDPOINTS))
+        self.provider_limits = provider_limits or {}
+        self.timeout = timeout
+        if session is None:
+            import requests
+
+            session = requests.Session()
+            session.headers.update(HEADERS)
+        self.session = session
+
+    def _lookup(self, provider: str, url: str) -> tuple[dict[str, Any] | None, bool]:
+        """(metadata or None, whether the answer may be cached); transient failures are not cacheable."""
+        import requests
+
+        try:
+            r = self.session.get(self.endpoints[provider], params={"url": url, "format": "json"}, timeout=self.timeout)
+            if r.status_code != 200:
+                return None, r.status_code in MISS_STATUSES
+            data = r.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"oEmbed error {url}: {e}")
+            return None, False
+        duration = data.get("duration")
+        return {
+            "videoTitle": data.get("title"),
+            "videoDuration": int(duration) if isinstance(duration, (int, float)) else None,
+            "thumbnailUrl": data.get("thumbnail_url"),
+            "videoProvider": data.get("provider_name") or provider,
+        }, True
+
+    def resolve_many(self, urls: Iterable[str]) -> dict[str, dict[str, Any] | None]:
+        """{url: metadata or None} for every distinct provider URL in urls."""
+        results: dict[str, dict[str, Any] | None] = {}
+        by_provider: dict[str, list[str]] = defaultdict(list)
+        for url in dict.fromkeys(urls):
+            found = video_provider(url) if url else None
+            if found is None or found[0] not in self.endpoints:
+                continue
+            if self.cache is not None:
+                hit, meta = self.cache.get(url)
+                if hit:
+                    results[url] = meta
+                    continue
+            by_provider[found[0]].append(url)
+        if not by_provider:
+            return results
+
+        def resolve_provider(provider: str) -> dict[str, tuple[dict[str, Any] | None, bool]]:
+            pending = by_provider[provider]
+            limit = self.provider_limits.get(provider, DEFAULT_PROVIDER_LIMIT)
+            with ThreadPoolExecutor(max_workers=min(limit, len(pending))) as pool:
+                return dict(zip(pending, pool.map(lambda u: self._lookup(provider, u), pending)))
+
+        # One pool per provider, so a slow provider never holds another's slots.
+        with ThreadPoolExecutor(max_workers=len(by_provider)) as pool:
+            for fetched in pool.map(resolve_provider, list(by_provider)):
+                results.update((url, meta) for url, (meta, _) in fetched.items())
+                if self.cache is not None:
+                    self.cache.put_many({url: meta for url, (meta, cacheable) in fetched.items() if cacheable})
+        return results
+
+
+def attach_video_metadata(courses: list[dict[str, Any]], resolver: OEmbedResolver) -> int:
+    """Add videoTitle / videoDuration / thumbnailUrl / videoProvider to video sections (in place). Returns sections updated."""
+    sections = [
+        s for c in courses for s in c.get("contentSections") or []
+        if s.get("type") == "video" and s.get("videoUrl")
+    ]
+    results = resolver.resolve_many(s["videoUrl"] for s in sections)
+    updated = 0
+    for section in sections:
+        meta = results.get(section["videoUrl"])
+        if meta:
+            section.update({k: v for k, v in meta.items() if v is not None})
+            updated += 1
+    return updated
@@ -0,0 +1,149 @@
+"""
+Text normalization and section compaction for scraped training content.
+Joins text across inline/block boundaries without gluing words, normalizes Unicode and
+whitespace, collapses repeated runs, and folds headings into the content that follows
+so each course ships fewer, smaller sections.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from bs4 import Tag
+
+# Elements whose boundaries separate words (get_text(strip=True) glues them together).
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li",
+    "main", "nav", "ol", "p", "section", "table", "td", "th", "tr", "ul",
+    # Menu toggles are inline elements laid out as blocks next to their link.
+    "button",
+})
+
+_ZERO_WIDTH = re.compile("[\u200b-\u200d\u2060\ufeff\u00ad]")
+_WHITESPACE = re.compile(r"\s+")
+# A label of two or more words (10+ characters, not starting with a digit) immediately
+# repeated, as menus and breadcrumbs render it ("About autism About autism"). Short repeats
+# are usually meant ("very very", "non non") and digit groups are numbers ("1 000 000").
+_REPEATED_PHRASE = re.compile(r"\b([^\W\d].{9,79}?)(?:\s+\1\b)+")
+# Decorative punctuation runs ("-----", "!!!!", "....").
+_REPEATED_PUNCT = re.compile(r"([^\w\s])\1{3,}")
+
+
+def normalize_text(text: str) -> str:
+    """NFKC-normalize, strip zero-width characters, collapse whitespace and repeated runs."""
+    text = unicodedata.normalize("NFKC", text)
+    text = _ZERO_WIDTH.sub("", text)
+    text = _WHITESPACE.sub(" ", text).strip()
+    text = _REPEATED_PUNCT.sub(r"\1\1\1", text)
+    return _REPEATED_PHRASE.sub(_collapse_phrase, text)
+
+
+def _collapse_phrase(match: re.Match) -> str:
+    phrase = match.group(1)
+    return phrase if " " in phrase else match.group(0)
+
+
+def element_text(tag: Tag) -> str:
+    """Normalized text of an element, with a space at every block boundary."""
+    parts: list[str] = []
+    _collect_text(tag, parts)
+    return normalize_text("".join(parts))
+
+
+def _collect_text(tag: Tag, parts: list[str]) -> None:
+    from bs4 import Comment, NavigableString, Tag
+
+    for node in tag.children:
+        if isinstance(node, Comment):
+            continue
+        if isinstance(node, NavigableString):
+            parts.append(str(node))
+        elif isinstance(node, Tag):
+            block = node.name in BLOCK_TAGS
+            if block:
+                parts.append(" ")
+            _collect_text(node, parts)
+            if block:
+                parts.append(" ")
+
+
+def _section_size(section: dict[str, Any]) -> int:
+    size = len(section.get("title") or "") + len(section.get("content") or "")
+    size += sum(len(item) for item in section.get("listItems") or [])
+    size += sum(len(k) + len(v) for k, v in (section.get("definitions") or {}).items())
+    return size
+
+
+def _truncate(section: dict[str, Any], budget: int) -> dict[str, Any]:
+    """Copy of section cut to at most budget characters (content at a word, then whole items)."""
+    s = dict(section)
+    room = max(0, budget - len(s.get("title") or ""))
+    content = s.get("content") or ""
+    if len(content) > room:
+        content = content[:room + 1].rsplit(" ", 1)[0] if " " in content[:room + 1] else content[:room]
+        s["content"] = content.rstrip()
+    room -= len(s.get("content") or "")
+    if s.get("listItems"):
+        items = []
+        for item in s["listItems"]:
+            if len(item) > room:
+                break
+            items.append(item)
+            room -= len(item)
+        s["listItems"] = items
+    if s.get("definitions"):
+        definitions = {}
+        for term, definition in s["definitions"].items():
+            if len(term) + len(definition) > room:
+                break
+            definitions[term] = definition
+            room -= len(term) + len(definition)
+        s["definitions"] = definitions
+    return s
+
+
+def _is_bare_heading(section: dict[str, Any]) -> bool:
+    return section.get("type") == "text" and bool(section.get("title")) and not section.get("content")
+
+
+def compact_sections(sections: list[dict[str, Any]], char_budget: int | None = None) -> list[dict[str, Any]]:
+    """
+    Fold each bare heading into the section that follows it, drop headings with nothing
+    under them and consecutive duplicates, and stop once char_budget characters are used.
+    Returns new section dicts with order renumbered.
+    """
+    out: list[dict[str, Any]] = []
+    pending_title: str | None = None
+    last_key: tuple | None = None
+    used = 0
+    for section in sections:
+        if _is_bare_heading(section):
+            # A heading directly followed by another heading only keeps the innermost one.
+            pending_title = section["title"]
+            continue
+        s = dict(section)
+        if pending_title and not s.get("title"):
+            s = {"type": s.get("type"), "title": pending_title, **s}
+        pending_title = None
+        if s.get("listItems"):
+            s["listItems"] = list(dict.fromkeys(s["listItems"]))
+        key = (s.get("content"), tuple(s.get("listItems") or ()), s.get("videoUrl"), s.get("imageUrl"))
+        if key == last_key:
+            continue
+        last_key = key
+        size = _section_size(s)
+        if char_budget is not None and used + size > char_budget:
+            if out:
+                break
+            # A first section larger than the whole budget is cut down rather than kept whole.
+            s = _truncate(s, char_budget)
+            s["order"] = 0
+            out.append(s)
+            break
+        used += size
+        s["order"] = len(out)
+        out.append(s)
+    return out
@@ -0,0 +1,218 @@
+"""
+Local HTTP/JSON service exposing scrape_url() on demand (e.g. for admin "refresh this course").
+
+- Concurrent requests for the same URL share one fetch + parse (request coalescing).
+- Results are cached in memory for --ttl seconds; for a further --stale seconds the cached
+  course is returned immediately while a background refresh runs (stale-while-revalidate).
+- At most --concurrency scrapes run at once and at most --max-pending distinct URLs may be
+  queued or running; beyond that the service answers 503 with Retry-After.
+
+Endpoints:
+  GET /scrape?url=<url>[&refresh=1]   -> {"course": {...}, "cached": bool, "stale": bool, "ageSec": float}
+  GET /stats                          -> cache and request counters
+
+Usage:
+  python scrape_service.py --port 8765
+  curl 'http://127.0.0.1:8765/scrape?url=https://teacch.com/training/'
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+from scraper import resolve_video_metadata, scrape_url
+
+DEFAULT_TTL_SEC = 15 * 60
+DEFAULT_STALE_SEC = 24 * 3600
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_PENDING = 64
+DEFAULT_MAX_ENTRIES = 2048
+# Cold scrapes include the polite delay and robots.txt fetch.
+REQUEST_TIMEOUT_SEC = 120
+
+
+def scrape_with_media(url: str) -> dict[str, Any] | None:
+    """scrape_url() plus oEmbed metadata on its video sections."""
+    course = scrape_url(url)
+    if course is not None:
+        resolve_video_metadata([course])
+    return course
+
+
+class ServiceBusy(Exception):
+    """Too many distinct URLs are already queued or being scraped."""
+
+
+class ScrapeFailed(Exception):
+    """scrape_url() returned nothing (fetch error or disallowed by robots.txt)."""
+
+
+class ScrapeService:
+    """Coalescing, TTL + stale-while-revalidate cache in front of a scrape function."""
+
+    def __init__(
+        self,
+        scrape: Callable[[str], dict[str, Any] | None] = scrape_with_media,
+        ttl_sec: float = DEFAULT_TTL_SEC,
+        stale_sec: float = DEFAULT_STALE_SEC,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.scrape = scrape
+        self.ttl_sec = ttl_sec
+        self.stale_sec = stale_sec
+        self.max_pending = max_pending
+        self.max_entries = max_entries
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scrape")
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self.stats = {"hits": 0, "staleHits": 0, "misses": 0, "coalesced": 0, "rejected": 0, "failures": 0}
+
+    def _run(self, url: str) -> dict[str, Any] | None:
+        course = None
+        try:
+            course = self.scrape(url)
+        finally:
+            with self._lock:
+                self._inflight.pop(url, None)
+                if course is not None:
+                    self._cache[url] = (time.monotonic(), course)
+                    self._cache.move_to_end(url)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+                else:
+                    self.stats["failures"] += 1
+        return course
+
+    def _start(self, url: str) -> Future:
+        """Join the running scrape of url or start one. Caller holds the lock."""
+        future = self._inflight.get(url)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return future
+        if len(self._inflight) >= self.max_pending:
+            self.stats["rejected"] += 1
+            raise ServiceBusy(url)
+        # Submitted under the lock, so _run cannot remove the entry before it is added.
+        future = self._pool.submit(self._run, url)
+        self._inflight[url] = future
+        return future
+
+    def get(self, url: str, refresh: bool = False, timeout: float = REQUEST_TIMEOUT_SEC) -> dict[str, Any]:
+        """Course for url with cache metadata; raises ServiceBusy, ScrapeFailed or TimeoutError."""
+        with self._lock:
+            entry = self._cache.get(url)
+            if entry is not None and not refresh:
+                age = time.monotonic() - entry[0]
+                if age <= self.ttl_sec:
+                    self.stats["hits"] += 1
+                    self._cache.move_to_end(url)
+                    return {"course": entry[1], "cached": True, "stale": False, "ageSec": round(age, 3)}
+                if age <= self.ttl_sec + self.stale_sec:
+                    self.stats["staleHits"] += 1
+                    try:
+                        self._start(url)
+                    except ServiceBusy:
+                        pass  # serve stale; a later request will revalidate
+                    return {"course": entry[1], "cached": True, "stale": True, "ageSec": round(age, 3)}
+            self.stats["misses"] += 1
+            future = self._start(url)
+        try:
+            course = future.result(timeout)
+        except FutureTimeout:
+            raise TimeoutError(url) from None
+        if course is None:
+            raise ScrapeFailed(url)
+        return {"course": course, "cached": False, "stale": False, "ageSec": 0.0}
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._cache), "inflight": len(self._inflight)}
+
+
+def make_handler(service: ScrapeService) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict[str, Any], headers: dict[str, str] | None = None):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/stats":
+                self._send(200, service.snapshot())
+                return
+            if parsed.path != "/scrape":
+                self._send(404, {"error": "not found"})
+                return
+            query = parse_qs(parsed.query)
+            url = (query.get("url") or [""])[0]
+            if urlparse(url).scheme not in ("http", "https"):
+                self._send(400, {"error": "url must be an http(s) URL"})
+                return
+            refresh = (query.get("refresh") or ["0"])[0] in ("1", "true")
+            try:
+                self._send(200, service.get(url, refresh))
+            except ServiceBusy:
+                self._send(503, {"error": "too many scrapes in progress"}, {"Retry-After": "5"})
+            except ScrapeFailed:
+                self._send(502, {"error": f"could not scrape {url}"})
+            except TimeoutError:
+                self._send(504, {"error": f"scrape of {url} still running"})
+            except Exception as e:
+                # A bug in the scrape: answer instead of dropping the connection.
+                print(f"Error scraping {url}:", file=sys.stderr)
+                traceback.print_exc()
+                self._send(500, {"error": f"scrape of {url} failed: {e}"})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def serve(service: ScrapeService, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="On-demand scrape_url() service with coalescing and caching")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_SEC, help="Seconds a result is served as fresh")
+    parser.add_argument("--stale", type=float, default=DEFAULT_STALE_SEC, help="Further seconds it is served while refreshing")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Max scrapes running at once")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING, help="Max distinct URLs queued or running")
+    args = parser.parse_args()
+
+    service = ScrapeService(ttl_sec=args.ttl, stale_sec=args.stale, concurrency=args.concurrency, max_pending=args.max_pending)
+    server = serve(service, args.host, args.port)
+    print(f"Scrape service on http://{args.host}:{server.server_address[1]}/scrape?url=...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,21 @@
 """
 Scrape official autism training sources.
-Extracts: titles, descriptions, sections (headings, paragraphs), video links, definitions.
-Respects robots.txt (check with urllib.robotparser before fetching).
+Extracts: titles, descriptions, sections (headings, paragraphs), video links, images, definitions.
+Respects robots.txt (compiled once per host by scraping/robots_policy.py, checked before fetching).
 Output: JSON compatible with CogniCare backend training API (contentSections, quiz placeholder).
 """
 from __future__ import annotations
 
 import json
 import re
-import time
-from typing import Any
-from urllib.parse import urljoin, urlparse
-from urllib.robotparser import RobotFileParser
-
-import requests
-from bs4 import BeautifulSoup
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urljoin
 
 from config import (
+    COURSE_CHAR_BUDGET,
     HEADERS,
     REQUEST_DELAY,
     WHO_CAREGIVER,
@@ -25,53 +24,86 @@ from config import (
     AUTISM_SPEAKS_TEACCH,
     TEACCH_HOME,
 )
+from media import OEmbedCache, OEmbedResolver, attach_video_metadata, embed_url, image_url, video_provider
+from normalize import compact_sections, element_text, normalize_text
+
+# Shared crawl infrastructure (parse cache, ...) lives in scraping/.
+SCRAPING_DIR = Path(__file__).resolve().parents[2] / "scraping"
+if str(SCRAPING_DIR) not in sys.path:
+    sys.path.append(str(SCRAPING_DIR))
+
+from parse_cache import cached_parse  # noqa: E402
+from robots_policy import RobotsCache, RobotsPolicy  # noqa: E402
+from warc_archive import add_arguments as add_warc_arguments, configure_from_args, install, polite_sleep  # noqa: E402
+
+if TYPE_CHECKING:
+    import requests
+    from bs4 import BeautifulSoup
+
+# Bump when parse_page output changes for the same HTML (invalidates cached parses).
+EXTRACTOR_VERSION = 3
+QUIZZES_FILE = Path(__file__).resolve().parent / "quizzes.json"
+
+_session: requests.Session | None = None
+_robots: RobotsCache | None = None
+
 
+def get_session() -> requests.Session:
+    """Shared HTTP session; WARC record/replay adapters (--record/--replay) are mounted on it."""
+    global _session
+    if _session is None:
+        import requests
 
-def can_fetch(robot_parser: RobotFileParser, url: str, user_agent: str) -> bool:
+        _session = install(requests.Session())
+        _session.headers.update(HEADERS)
+    return _session
+
+
+def can_fetch(policy: RobotsPolicy, url: str, user_agent: str) -> bool:
     """Check robots.txt for URL and user agent."""
-    try:
-        return robot_parser.can_fetch(user_agent, url)
-    except Exception:
-        return True
+    return policy.can_fetch(user_agent, url)
 
 
-def fetch_robots_txt(base_url: str) -> RobotFileParser:
-    parsed = urlparse(base_url)
-    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-    rp = RobotFileParser()
-    try:
-        rp.set_url(robots_url)
-        rp.read()
-    except Exception:
-        pass
-    return rp
-
-
-def fetch_page(url: str) -> str | None:
-    """Fetch HTML; respect robots.txt and delay."""
-    parsed = urlparse(url)
-    origin = f"{parsed.scheme}://{parsed.netloc}"
-    rp = fetch_robots_txt(origin)
-    if not can_fetch(rp, url, HEADERS["User-Agent"]):
+def _get_robots_txt(robots_url: str) -> tuple[int, str]:
+    r = get_session().get(robots_url, timeout=15)
+    return r.status_code, r.text
+
+
+def fetch_robots_txt(base_url: str) -> RobotsPolicy:
+    """
+    Compiled robots.txt of base_url's host, fetched (through the shared session) once per run.
+    Same status handling as RobotFileParser.read(): 401/403 and 5xx disallow the host, other
+    4xx allow it, and an unreachable host (or, under --replay, a robots.txt missing from the
+    archive) disallows it; failures are retried after a few minutes.
+    """
+    global _robots
+    if _robots is None:
+        _robots = RobotsCache(_get_robots_txt)
+    return _robots.policy(base_url)
+
+
+def fetch_page(url: str) -> bytes | None:
+    """Fetch raw HTML bytes (BeautifulSoup detects the charset); respect robots.txt and delay."""
+    if not can_fetch(fetch_robots_txt(url), url, HEADERS["User-Agent"]):
         print(f"Skip (robots.txt): {url}")
         return None
-    time.sleep(REQUEST_DELAY)
+    polite_sleep(REQUEST_DELAY)
     try:
-        r = requests.get(url, headers=HEADERS, timeout=15)
+        r = get_session().get(url, timeout=15)
         r.raise_for_status()
-        return r.text
+        return r.content
     except Exception as e:
         print(f"Error fetching {url}: {e}")
         return None
 
 
 def extract_sections(soup: BeautifulSoup) -> list[dict[str, Any]]:
-    """Extract structured sections: headings, paragraphs, lists, links (including video)."""
+    """Extract structured sections: headings, paragraphs, lists, links, embeds (including video) and images."""
     sections = []
     order = 0
-    for tag in soup.find_all(["h1", "h2", "h3", "h4", "p", "ul", "ol"]):
+    for tag in soup.find_all(["h1", "h2", "h3", "h4", "p", "ul", "ol", "iframe", "video", "figure", "img"]):
         if tag.name in ("h1", "h2", "h3", "h4"):
-            text = tag.get_text(strip=True)
+            text = element_text(tag)
             if not text:
                 continue
             sections.append({
@@ -82,13 +114,17 @@ def extract_sections(soup: BeautifulSoup) -> list[dict[str, Any]]:
             })
             order += 1
         elif tag.name == "p":
-            text = tag.get_text(strip=True)
+            text = element_text(tag)
             if not text or len(text) < 10:
                 continue
             # Detect video links
             video_url = None
             for a in tag.find_all("a", href=True):
                 href = a.get("href", "")
+                known = video_provider(href)
+                if known:
+                    video_url = known[1]
+                    break
                 if "youtube" in href or "vimeo" in href or "video" in href.lower():
                     video_url = href if href.startswith("http") else urljoin(str(tag.base_url or ""), href)
                     break
@@ -100,7 +136,10 @@ def extract_sections(soup: BeautifulSoup) -> list[dict[str, Any]]:
             })
             order += 1
         elif tag.name in ("ul", "ol"):
-            items = [li.get_text(strip=True) for li in tag.find_all("li") if li.get_text(strip=True)]
+            if tag.find_parent(["ul", "ol"]):
+                # Already included in the enclosing list's items.
+                continue
+            items = [text for text in (element_text(li) for li in tag.find_all("li", recursive=False)) if text]
             if not items:
                 continue
             sections.append({
@@ -109,6 +148,32 @@ def extract_sections(soup: BeautifulSoup) -> list[dict[str, Any]]:
                 "order": order,
             })
             order += 1
+        elif tag.name in ("iframe", "video"):
+            video_url = embed_url(tag)
+            if not video_url:
+                continue
+            section = {"type": "video", "content": "", "videoUrl": video_url, "order": order}
+            label = normalize_text(tag.get("title") or tag.get("aria-label") or "")
+            if label:
+                section["title"] = label
+            sections.append(section)
+            order += 1
+        elif tag.name in ("figure", "img"):
+            if tag.name == "img" and tag.find_parent("figure"):
+                # Handled with its <figure> (and caption).
+                continue
+            img = tag if tag.name == "img" else tag.find("img")
+            src = image_url(img) if img else None
+            if not src:
+                continue
+            caption = tag.find("figcaption") if tag.name == "figure" else None
+            sections.append({
+                "type": "image",
+                "content": element_text(caption) if caption else normalize_text(img.get("alt") or ""),
+                "imageUrl": src,
+                "order": order,
+            })
+            order += 1
     return sections
 
 
@@ -120,8 +185,8 @@ def extract_definitions(soup: BeautifulSoup) -> list[dict[str, Any]]:
     if dl:
         definitions = {}
         for dt, dd in zip(dl.find_all("dt"), dl.find_all("dd")):
-            term = dt.get_text(strip=True)
-            definition = dd.get_text(strip=True)
+            term = element_text(dt)
+            definition = element_text(dd)
             if term and definition:
                 definitions[term] = definition
         if definitions:
@@ -134,11 +199,10 @@ def extract_definitions(soup: BeautifulSoup) -> list[dict[str, Any]]:
     return sections
 
 
-def scrape_url(url: str, title_override: str | None = None) -> dict[str, Any] | None:
-    """Scrape one URL and return a course-like structure (no quiz; to be added manually or generated)."""
-    html = fetch_page(url)
-    if not html:
-        return None
+def parse_page(html: str | bytes) -> dict[str, Any]:
+    """Parse a fetched page into title, meta description and (unbudgeted) contentSections."""
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
     # Remove script/style
     for t in soup(["script", "style"]):
@@ -146,15 +210,38 @@ def scrape_url(url: str, title_override: str | None = None) -> dict[str, Any] |
     sections = extract_sections(soup)
     sections.extend(extract_definitions(soup))
     sections.sort(key=lambda s: s["order"])
-    title = title_override or soup.find("title")
-    title = title.get_text(strip=True) if hasattr(title, "get_text") else str(title) or url
-    if len(title) > 200:
-        title = title[:197] + "..."
+    title_el = soup.find("title")
     # Meta description
     desc = ""
     meta = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
     if meta and meta.get("content"):
-        desc = meta["content"].strip()[:1000]
+        desc = normalize_text(meta["content"])[:1000]
+    return {
+        "title": element_text(title_el) if title_el else "",
+        "description": desc,
+        "contentSections": compact_sections(sections),
+    }
+
+
+def scrape_url(
+    url: str,
+    title_override: str | None = None,
+    char_budget: int | None = COURSE_CHAR_BUDGET,
+) -> dict[str, Any] | None:
+    """Scrape one URL and return a course-like structure (no quiz; to be added manually or generated)."""
+    html = fetch_page(url)
+    if not html:
+        return None
+    # Unchanged pages are served from the parse cache instead of being re-parsed.
+    page = cached_parse(html, "scrape_url", EXTRACTOR_VERSION, lambda: parse_page(html))
+    sections = compact_sections(page["contentSections"], char_budget)
+    for section in sections:
+        if section.get("imageUrl"):
+            section["imageUrl"] = urljoin(url, section["imageUrl"])
+    title = title_override or page["title"] or url
+    if len(title) > 200:
+        title = title[:197] + "..."
+    desc = page["description"]
     if not desc and sections:
         first_text = next((s.get("content") or s.get("title") or "" for s in sections if s.get("content") or s.get("title")), "")
         desc = first_text[:500] if isinstance(first_text, str) else ""
@@ -170,6 +257,11 @@ def scrape_url(url: str, title_override: str | None = None) -> dict[str, Any] |
     }
 
 
+def resolve_video_metadata(courses: list[dict[str, Any]]) -> int:
+    """Attach cached oEmbed metadata (title, duration, thumbnail) to all video sections of courses in one batch."""
+    return attach_video_metadata(courses, OEmbedResolver(OEmbedCache(), session=get_session()))
+
+
 def _merge_sections(sections_list: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
     """Merge multiple section lists and renumber order."""
     out: list[dict[str, Any]] = []
@@ -183,32 +275,22 @@ def _merge_sections(sections_list: list[list[dict[str, Any]]]) -> list[dict[str,
     return out
 
 
-# Quiz questions (French) for each course — used when generating from scraped content
-QUIZ_COURSE_1 = [
-    {"question": "L'autisme est une condition qui affecte principalement :", "options": ["Uniquement le langage", "La communication, les interactions sociales et le comportement", "Uniquement la motricité", "Uniquement la vision"], "correctIndex": 1, "order": 0},
-    {"question": "Pourquoi les routines sont-elles souvent utiles pour un enfant autiste ?", "options": ["Pour le fatiguer", "Elles réduisent l'anxiété en rendant le monde prévisible", "Pour le punir", "Les routines ne sont pas recommandées"], "correctIndex": 1, "order": 1},
-    {"question": "Que faire en priorité pendant une crise (meltdown) ?", "options": ["Crier pour se faire entendre", "Assurer la sécurité et rester calme en attendant que ça passe", "Forcer l'enfant à s'arrêter", "Ignorer complètement"], "correctIndex": 1, "order": 2},
-    {"question": "Le « stimming » désigne :", "options": ["Une maladie", "Des comportements répétitifs d'auto-stimulation qui aident à réguler", "Un médicament", "Une thérapie"], "correctIndex": 1, "order": 3},
-    {"question": "Concernant l'alimentation des enfants autistes :", "options": ["Il faut toujours forcer à manger de tout", "Beaucoup ont des particularités (sélectivité) ; il faut proposer progressivement sans forcer", "Ils ne doivent pas manger de sucre du tout", "L'alimentation n'a pas d'impact"], "correctIndex": 1, "order": 4},
-]
-QUIZ_COURSE_2 = [
-    {"question": "Le PECS est un système de communication basé sur :", "options": ["La parole uniquement", "L'échange d'une image contre un objet ou une action", "Le geste uniquement", "L'écriture"], "correctIndex": 1, "order": 0},
-    {"question": "Pourquoi le PECS convient-il bien aux enfants autistes peu verbaux ?", "options": ["Parce qu'il exige d'abord la parole", "Parce qu'il s'appuie sur le visuel et ne demande pas d'imitation verbale au départ", "Parce qu'il remplace totalement la parole", "Parce qu'il est plus simple que la langue des signes"], "correctIndex": 1, "order": 1},
-    {"question": "Dans la phase 1 du PECS, l'enfant apprend à :", "options": ["Lire des mots", "Donner une image pour obtenir l'objet désiré", "Parler à haute voix", "Écrire une phrase"], "correctIndex": 1, "order": 2},
-    {"question": "Quel type de support est typiquement utilisé pour le PECS ?", "options": ["Un cahier d'écriture", "Un classeur avec images et bandes Velcro", "Une tablette sans images", "Un tableau noir"], "correctIndex": 1, "order": 3},
-]
-QUIZ_COURSE_3 = [
-    {"question": "TEACCH est un programme qui :", "options": ["Se concentre uniquement sur la parole", "Adapte l'environnement et l'enseignement aux particularités des personnes autistes", "Exclut l'usage d'images", "N'est utilisé qu'à l'hôpital"], "correctIndex": 1, "order": 0},
-    {"question": "L'emploi du temps visuel sert à :", "options": ["Remplacer l'école", "Montrer à l'enfant dans quel ordre vont se dérouler les activités pour le rassurer", "Punir l'enfant", "Réduire le temps de jeu"], "correctIndex": 1, "order": 1},
-    {"question": "Le « système de travail » en TEACCH permet à l'enfant de :", "options": ["Jouer librement sans consigne", "Voir combien de tâches restent et ce qu'il faut faire (séquence claire)", "Éviter tout travail", "Travailler sans support visuel"], "correctIndex": 1, "order": 2},
-    {"question": "La structure physique dans TEACCH consiste à :", "options": ["Construire un nouveau bâtiment", "Organiser l'espace en zones clairement identifiables (travail, jeu, repos)", "Supprimer tous les meubles", "Utiliser uniquement des couleurs sombres"], "correctIndex": 1, "order": 3},
-]
-
-
-def build_courses_from_live_scrape() -> list[dict[str, Any]]:
+def load_quiz(course: str) -> list[dict[str, Any]]:
+    """French quiz questions for a generated course ("general", "pecs", "teacch"), from quizzes.json."""
+    return [dict(q) for q in _quizzes()[course]]
+
+
+@lru_cache(maxsize=1)
+def _quizzes() -> dict[str, list[dict[str, Any]]]:
+    with open(QUIZZES_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_courses_from_live_scrape(char_budget: int | None = COURSE_CHAR_BUDGET) -> list[dict[str, Any]]:
     """
     Generate the 3 courses by scraping the official URLs. Content comes from the sites;
     title, description, topics and quiz are set by us. Output is ready for backend seed or API.
+    char_budget caps the text size of each course's merged contentSections.
     """
     courses = []
 
@@ -216,10 +298,10 @@ def build_courses_from_live_scrape() -> list[dict[str, Any]]:
     print("Scraping Course 1 (General Autism): WHO, NAS, Autism Speaks...")
     parts_1 = []
     for url in [WHO_CAREGIVER, NAS_TRAINING, AUTISM_SPEAKS_CST]:
-        c = scrape_url(url, None)
+        c = scrape_url(url, None, char_budget)
         if c and c.get("contentSections"):
             parts_1.append(c["contentSections"])
-    sections_1 = _merge_sections(parts_1) if parts_1 else [
+    sections_1 = compact_sections(_merge_sections(parts_1), char_budget) if parts_1 else [
         {"type": "text", "title": "Autism overview", "content": "Content from official sources (WHO, NAS, Autism Speaks). Run the scraper when the sites are reachable.", "order": 0},
     ]
     courses.append({
@@ -228,14 +310,14 @@ def build_courses_from_live_scrape() -> list[dict[str, Any]]:
         "contentSections": sections_1,
         "sourceUrl": WHO_CAREGIVER,
         "topics": ["autisme général", "compétences aidant", "OMS", "comportement", "nutrition"],
-        "quiz": QUIZ_COURSE_1,
+        "quiz": load_quiz("general"),
         "approved": True,
         "order": 1,
     })
 
     # Course 2 — PECs: Autism Speaks Caregiver Skills Training
     print("Scraping Course 2 (PECS): Autism Speaks CST...")
-    c2 = scrape_url(AUTISM_SPEAKS_CST, None)
+    c2 = scrape_url(AUTISM_SPEAKS_CST, None, char_budget)
     sections_2 = c2["contentSections"] if c2 and c2.get("contentSections") else [
         {"type": "text", "title": "PECS / Communication", "content": "Content from Autism Speaks Caregiver Skills Training. Run the scraper when the site is reachable.", "order": 0},
     ]
@@ -245,7 +327,7 @@ def build_courses_from_live_scrape() -> list[dict[str, Any]]:
         "contentSections": sections_2,
         "sourceUrl": AUTISM_SPEAKS_CST,
         "topics": ["PECS", "communication", "support visuel"],
-        "quiz": QUIZ_COURSE_2,
+        "quiz": load_quiz("pecs"),
         "approved": True,
         "order": 2,
     })
@@ -254,10 +336,10 @@ def build_courses_from_live_scrape() -> list[dict[str, Any]]:
     print("Scraping Course 3 (TEACCH): TEACCH, Autism Speaks...")
     parts_3 = []
     for url in [TEACCH_HOME, AUTISM_SPEAKS_TEACCH]:
-        c = scrape_url(url, None)
+        c = scrape_url(url, None, char_budget)
         if c and c.get("contentSections"):
             parts_3.append(c["contentSections"])
-    sections_3 = _merge_sections(parts_3) if parts_3 else [
+    sections_3 = compact_sections(_merge_sections(parts_3), char_budget) if parts_3 else [
         {"type": "text", "title": "TEACCH structured teaching", "content": "Content from TEACCH and Autism Speaks. Run the scraper when the sites are reachable.", "order": 0},
     ]
     courses.append({
@@ -266,7 +348,7 @@ def build_courses_from_live_scrape() -> list[dict[str, Any]]:
         "contentSections": sections_3,
         "sourceUrl": TEACCH_HOME,
         "topics": ["TEACCH", "enseignement structuré", "organisation visuelle"],
-        "quiz": QUIZ_COURSE_3,
+        "quiz": load_quiz("teacch"),
         "approved": True,
         "order": 3,
     })
@@ -329,7 +411,10 @@ def build_course_3_teacch() -> dict[str, Any]:
     }
 
 
-def run_scraper(urls: list[tuple[str, str | None]] | None = None) -> list[dict[str, Any]]:
+def run_scraper(
+    urls: list[tuple[str, str | None]] | None = None,
+    char_budget: int | None = COURSE_CHAR_BUDGET,
+) -> list[dict[str, Any]]:
     """
     Run scraper on given (url, title_override) list.
     If urls is None, returns the three built-in course templates (no live scrape).
@@ -337,7 +422,7 @@ def run_scraper(urls: list[tuple[str, str | None]] | None = None) -> list[dict[s
     if urls:
         courses = []
         for url, title_override in urls:
-            c = scrape_url(url, title_override)
+            c = scrape_url(url, title_override, char_budget)
             if c:
                 courses.append(c)
         return courses
@@ -355,15 +440,27 @@ def main():
     parser.add_argument("--out", default="training_courses.json", help="Output JSON file")
     parser.add_argument("--templates-only", action="store_true", help="Output only the 3 course templates (no live fetch)")
     parser.add_argument("--scrape-courses", action="store_true", help="Generate 3 courses from official sites (WHO, TEACCH, NAS, Autism Speaks); write to --out for backend seed")
+    parser.add_argument("--char-budget", type=int, default=COURSE_CHAR_BUDGET, help="Max text characters per course (0 = unlimited)")
+    parser.add_argument("--no-oembed", action="store_true", help="Do not resolve video titles/durations/thumbnails")
+    parser.add_argument("--images", action="store_true", help="Download images and replace them with deduplicated WebP thumbnails (images.py)")
+    add_warc_arguments(parser)
     args = parser.parse_args()
+    configure_from_args(args)
+    char_budget = args.char_budget or None
 
     if args.scrape_courses:
-        courses = build_courses_from_live_scrape()
+        courses = build_courses_from_live_scrape(char_budget)
     else:
         urls = None
         if not args.templates_only and args.url:
             urls = [(u[0], u[1] or None) for u in args.url]
-        courses = run_scraper(urls)
+        courses = run_scraper(urls, char_budget)
+    if not args.no_oembed:
+        resolve_video_metadata(courses)
+    if args.images:
+        from images import attach_images
+
+        attach_images(courses)
 
     with open(args.out, "w", encoding="utf-8") as f:
         json.dump(courses, f, indent=2, ensure_ascii=False)